@@ -0,0 +1,296 @@
+"""
+질문/응답 보관함 (archive.jsonl.gz + archive.idx)
+════════════════════════════════════════════════════════════════════════════════
+보낸 질문과 응답을 압축해 쌓아 두고, 통째로 내보내거나 다시 보낼 때 씁니다.
+
+  archive.jsonl.gz  레코드 하나 = gzip 멤버 하나 (JSON 한 줄)
+                    → 파일 전체가 그대로 올바른 .jsonl.gz (zcat / gzip.open으로 읽힘)
+  archive.idx       레코드마다 고정 길이 항목 (ID, 시각, 오프셋, 길이)
+
+  - 추가: 두 파일 끝에 한 번씩 쓰기 — 기존 내용은 다시 쓰지 않음 (O(1))
+  - ID 조회: 메모리 색인 dict → seek + 해당 멤버만 압축 해제
+  - 기간 내보내기: 색인의 시각으로 고른 멤버를 압축된 그대로 복사
+    (다시 압축하지 않음, 이어진 멤버는 한 번에 읽음) → 보관함 크기와 무관하게
+    메모리는 청크 하나
+  - 쓰다가 종료돼 짝이 안 맞는 끝부분은 다음 실행 때 정리: 데이터 없는 색인
+    항목은 버리고, 색인 없는 데이터는 멤버를 읽어 색인을 다시 만듦 (색인 파일을
+    지워도 복구됨). 깨진 멤버는 건너뛰고 다음 gzip 헤더부터 계속 읽으며,
+    파일 끝까지 이어지는 손상(잘린 마지막 멤버)만 잘라냄
+
+zstd는 외부 패키지(zstandard)가 필요해 표준 라이브러리 gzip을 씁니다.
+
+명령줄:
+  python archive.py stats
+  python archive.py show <ID>
+  python archive.py export out.jsonl.gz [--since 2026-01-01] [--until 2026-02-01]
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import gzip
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+# ID(uuid4 hex, 32바이트) / 시각 / 데이터 오프셋 / 압축 길이
+_ENTRY   = struct.Struct("<32sdQI")
+ID_BYTES = 32
+
+COMPRESS_LEVEL = 6
+EXPORT_CHUNK   = 1024 * 1024
+RECOVER_CHUNK  = 16 * 1024
+
+_MAGIC = b"\x1f\x8b\x08"      # gzip 멤버 헤더 (deflate)
+
+
+def index_path_for(path: str) -> str:
+    """archive.jsonl.gz → archive.idx"""
+    base = path[:-len(".jsonl.gz")] if path.endswith(".jsonl.gz") else path
+    return base + ".idx"
+
+
+class Archive:
+
+    def __init__(self, path: str, index_path: str = None):
+        self._path       = path
+        self._index_path = index_path or index_path_for(path)
+        self._lock       = threading.Lock()
+        self._ids        = {}      # ID → 색인 위치
+        self._times      = []      # 색인 위치 → 시각
+        self._spans      = []      # 색인 위치 → (오프셋, 길이)
+        self._end        = 0       # 데이터 파일에서 색인이 가리키는 끝
+        self._load()
+
+    def _load(self) -> None:
+        """색인 파일만 읽습니다 (데이터 파일은 크기만 확인)."""
+        try:
+            with open(self._index_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+        try:
+            data_size = os.path.getsize(self._path)
+        except FileNotFoundError:
+            data_size = 0
+
+        count = len(raw) // _ENTRY.size
+        for i, (rid, ts, offset, length) in enumerate(_ENTRY.iter_unpack(raw[:count * _ENTRY.size])):
+            if offset + length > data_size:
+                count = i          # 데이터가 덜 써진 레코드부터 버림
+                break
+            self._add(rid.rstrip(b"\0").decode("utf-8"), ts, offset, length)
+
+        if count * _ENTRY.size != len(raw):
+            with open(self._index_path, "r+b") as f:
+                f.truncate(count * _ENTRY.size)
+        if data_size > self._end:
+            self._recover()
+
+    def _add(self, record_id: str, ts: float, offset: int, length: int) -> None:
+        self._ids[record_id] = len(self._spans)
+        self._times.append(ts)
+        self._spans.append((offset, length))
+        self._end = offset + length
+
+    def _recover(self) -> None:
+        """색인 뒤에 남은 데이터 멤버를 하나씩 풀어 색인에 다시 넣습니다."""
+        entries = []
+        with open(self._path, "rb") as f:
+            offset = self._end
+            while offset is not None:
+                member = self._read_member(f, offset)
+                if member is None:
+                    # 깨진 멤버 — 다음 헤더부터 다시 (없으면 끝까지 손상)
+                    offset = self._find_member(f, offset + 1)
+                    continue
+                record, length = member
+                entries.append((record["id"], record["ts"], offset, length))
+                offset += length
+
+        with open(self._index_path, "ab") as f:
+            for record_id, ts, start, length in entries:
+                f.write(_ENTRY.pack(record_id.encode("utf-8"), ts, start, length))
+                self._add(record_id, ts, start, length)
+        # 마지막 온전한 멤버 뒤 (파일 끝까지 이어진 손상)만 잘라냄
+        with open(self._path, "r+b") as f:
+            f.truncate(self._end)
+
+    @staticmethod
+    def _read_member(f, offset: int):
+        """offset의 gzip 멤버 하나 → (레코드, 압축 길이). 깨졌거나 잘렸으면 None."""
+        f.seek(offset)
+        d, text, used = zlib.decompressobj(wbits=31), [], 0
+        try:
+            while not d.eof:
+                data = f.read(RECOVER_CHUNK)
+                if not data:
+                    return None
+                text.append(d.decompress(data))
+                used += len(data)
+            record = json.loads(b"".join(text))
+            record["id"].encode("utf-8"), float(record["ts"])
+        except (zlib.error, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        return record, used - len(d.unused_data)
+
+    @staticmethod
+    def _find_member(f, start: int):
+        """start 이후 첫 gzip 헤더 위치 (없으면 None)."""
+        f.seek(start)
+        pos, tail = start, b""
+        while True:
+            chunk = f.read(EXPORT_CHUNK)
+            if not chunk:
+                return None
+            buf = tail + chunk
+            i = buf.find(_MAGIC)
+            if i >= 0:
+                return pos - len(tail) + i
+            tail = buf[-(len(_MAGIC) - 1):]
+            pos += len(chunk)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __contains__(self, record_id) -> bool:
+        return record_id in self._ids
+
+    # ── 쓰기 ─────────────────────────────────────────────────────────────────
+
+    def append(self, record_id: str, record: dict) -> None:
+        """레코드를 추가합니다. record에 id/ts가 없으면 채움 (같은 ID는 나중 것이 조회됨)."""
+        key = record_id.encode("utf-8")
+        if len(key) > ID_BYTES:
+            raise ValueError(f"보관함 ID는 {ID_BYTES}바이트 이하: {record_id!r}")
+        record = {"id": record_id, "ts": time.time(), **record}
+        member = gzip.compress(
+            (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"),
+            compresslevel=COMPRESS_LEVEL,
+            mtime=0,
+        )
+        with self._lock:
+            offset = self._end
+            with open(self._path, "ab") as f:
+                f.write(member)
+            # 데이터 다음에 색인 — 중간에 끊기면 _load가 데이터에서 색인을 복구
+            with open(self._index_path, "ab") as f:
+                f.write(_ENTRY.pack(key, record["ts"], offset, len(member)))
+            self._add(record_id, record["ts"], offset, len(member))
+
+    # ── 읽기 ─────────────────────────────────────────────────────────────────
+
+    def get(self, record_id: str) -> dict:
+        """ID의 레코드 (없으면 None)."""
+        i = self._ids.get(record_id)
+        if i is None:
+            return None
+        offset, length = self._spans[i]
+        with open(self._path, "rb") as f:
+            f.seek(offset)
+            return json.loads(gzip.decompress(f.read(length)))
+
+    def _select(self, since: float = None, until: float = None) -> list:
+        """[since, until) 기간 레코드의 색인 위치 (추가 순서)."""
+        with self._lock:
+            times = list(self._times)
+        return [
+            i for i, ts in enumerate(times)
+            if (since is None or ts >= since) and (until is None or ts < until)
+        ]
+
+    def _runs(self, positions: list):
+        """이어진 멤버들을 (오프셋, 길이) 한 덩어리로 묶습니다."""
+        start = end = None
+        for i in positions:
+            offset, length = self._spans[i]
+            if offset == end:
+                end += length
+                continue
+            if start is not None:
+                yield start, end - start
+            start, end = offset, offset + length
+        if start is not None:
+            yield start, end - start
+
+    def iter_range(self, since: float = None, until: float = None):
+        """기간 안의 레코드를 하나씩 (압축 해제는 레코드 단위)."""
+        positions = self._select(since, until)
+        if not positions:
+            return
+        with open(self._path, "rb") as f:
+            for i in positions:
+                offset, length = self._spans[i]
+                f.seek(offset)
+                yield json.loads(gzip.decompress(f.read(length)))
+
+    def recent(self, n: int):
+        """마지막 n개 레코드를 하나씩 (오래된 것부터, 압축 해제는 레코드 단위)."""
+        with self._lock:
+            positions = range(max(0, len(self._spans) - n), len(self._spans))
+        if not positions:
+            return
+        with open(self._path, "rb") as f:
+            for i in positions:
+                offset, length = self._spans[i]
+                f.seek(offset)
+                yield json.loads(gzip.decompress(f.read(length)))
+
+    def export(self, out, since: float = None, until: float = None) -> int:
+        """기간 안의 레코드를 .jsonl.gz로 out(바이너리 파일)에 씁니다. 레코드 수 반환.
+
+        압축된 멤버를 그대로 복사하므로 다시 압축하지 않습니다.
+        """
+        positions = self._select(since, until)
+        if not positions:
+            return 0
+        with open(self._path, "rb") as f:
+            for offset, length in self._runs(positions):
+                f.seek(offset)
+                while length > 0:
+                    chunk = f.read(min(length, EXPORT_CHUNK))
+                    out.write(chunk)
+                    length -= len(chunk)
+        return len(positions)
+
+
+# ── 명령줄 ────────────────────────────────────────────────────────────────────
+
+def _parse_date(text: str) -> float:
+    return time.mktime(time.strptime(text, "%Y-%m-%d"))
+
+
+def main(argv=None) -> None:
+    import argparse
+
+    here   = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="질문/응답 보관함")
+    parser.add_argument("--archive", default=os.path.join(here, "archive.jsonl.gz"))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats")
+    show = sub.add_parser("show")
+    show.add_argument("id")
+    export = sub.add_parser("export")
+    export.add_argument("out")
+    export.add_argument("--since", type=_parse_date, help="YYYY-MM-DD (포함)")
+    export.add_argument("--until", type=_parse_date, help="YYYY-MM-DD (제외)")
+    args = parser.parse_args(argv)
+
+    archive = Archive(args.archive)
+    if args.cmd == "stats":
+        size = os.path.getsize(args.archive) if os.path.exists(args.archive) else 0
+        print(f"레코드 {len(archive)}개, {size / 1024:.1f} KiB")
+    elif args.cmd == "show":
+        record = archive.get(args.id)
+        if record is None:
+            raise SystemExit(f"없는 ID: {args.id}")
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+    else:
+        with open(args.out, "wb") as out:
+            count = archive.export(out, args.since, args.until)
+        print(f"{count}개 레코드 → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+서킷 브레이커 (Gemini / SMTP 백엔드별)
+════════════════════════════════════════════════════════════════════════════════
+백엔드가 죽었을 때 요청마다 타임아웃(최대 120초)을 다 기다리지 않도록
+최근 호출 결과를 보고 호출 자체를 막습니다.
+
+  closed     정상 — 최근 window건 중 실패율 또는 느린 호출 비율이 기준을 넘으면 open
+  open       즉시 CircuitOpen (ConnectionError 하위 클래스 → 기존 대기열 경로로 감)
+             open_seconds가 지나면 half-open
+  half-open  시험 호출 1건만 통과 — 성공하면 closed, 실패/느리면 다시 open
+
+실패로 세는 것은 is_failure(exc)가 True인 오류만 (네트워크/5xx/429/타임아웃).
+400/403, 인증 실패처럼 요청 쪽 문제는 백엔드 상태와 무관하므로 세지 않습니다.
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+import time
+from collections import deque
+
+from cancel import JobCancelled
+
+CLOSED    = "closed"
+OPEN      = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(ConnectionError):
+    """브레이커가 열려 있어 호출하지 않고 바로 실패함."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} 차단 중 — 약 {max(retry_in, 0):.0f}초 후 다시 시도")
+        self.name     = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+
+    def __init__(
+        self,
+        name: str,
+        is_failure=lambda exc: True,
+        slow_seconds: float = 30.0,
+        failure_rate: float = 0.5,
+        slow_rate: float = 0.8,
+        window: int = 10,
+        min_calls: int = 3,
+        open_seconds: float = 30.0,
+        on_change=None,
+    ):
+        self.name          = name
+        self._is_failure   = is_failure
+        self._slow_seconds = slow_seconds
+        self._failure_rate = failure_rate
+        self._slow_rate    = slow_rate
+        self._min_calls    = min_calls
+        self._open_seconds = open_seconds
+        self._on_change    = on_change or (lambda breaker: None)
+        self._results      = deque(maxlen=window)    # (실패, 느림)
+        self._state        = CLOSED
+        self._opened_at    = 0.0
+        self._trial        = False                   # half-open 시험 호출 진행 중
+        self._lock         = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return self._opened_at + self._open_seconds - time.monotonic()
+
+    def _set_state(self, state: str) -> bool:
+        changed, self._state = self._state != state, state
+        return changed
+
+    def _maybe_half_open(self, now: float) -> bool:
+        if self._state == OPEN and now - self._opened_at >= self._open_seconds:
+            return self._set_state(HALF_OPEN)
+        return False
+
+    def _before(self) -> bool:
+        """호출 허용 여부 확인. 허용된 호출이 half-open 시험 호출이면 True."""
+        with self._lock:
+            now     = time.monotonic()
+            changed = self._maybe_half_open(now)
+            if self._state == CLOSED:
+                trial = False
+            elif self._state == HALF_OPEN and not self._trial:
+                self._trial = trial = True
+            else:
+                raise CircuitOpen(self.name, self._opened_at + self._open_seconds - now)
+        if changed:
+            self._on_change(self)
+        return trial
+
+    def _abandon(self, trial: bool) -> None:
+        """결과를 판정할 수 없는 호출 — 상태도 기록도 바꾸지 않음 (시험 호출이면 자리만 비움)."""
+        if trial:
+            with self._lock:
+                self._trial = False
+
+    def _after(self, trial: bool, failed: bool, slow: bool) -> None:
+        with self._lock:
+            if trial:
+                self._trial = False
+                if failed or slow:
+                    changed = self._set_state(OPEN)
+                    self._opened_at = time.monotonic()
+                else:
+                    changed = self._set_state(CLOSED)
+                    self._results.clear()
+            else:
+                self._results.append((failed, slow))
+                changed = False
+                if self._state == CLOSED and len(self._results) >= self._min_calls:
+                    n = len(self._results)
+                    if (sum(f for f, _ in self._results) / n >= self._failure_rate
+                            or sum(s for _, s in self._results) / n >= self._slow_rate):
+                        changed = self._set_state(OPEN)
+                        self._opened_at = time.monotonic()
+                        self._results.clear()
+        if changed:
+            self._on_change(self)
+
+    def call(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) 실행. 열려 있으면 CircuitOpen."""
+        trial = self._before()
+        t0 = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except JobCancelled:
+            self._abandon(trial)                 # 사용자 취소/제한 시간 — 백엔드 상태와 무관
+            raise
+        except Exception as exc:
+            self._after(trial, self._is_failure(exc), time.monotonic() - t0 >= self._slow_seconds)
+            raise
+        except BaseException:
+            self._abandon(trial)                 # 중단(KeyboardInterrupt 등)은 판정하지 않음
+            raise
+        self._after(trial, False, time.monotonic() - t0 >= self._slow_seconds)
+        return result
@@ -4,6 +4,8 @@ package.name    = geminiclient
 package.domain  = org.geminiclient
 source.dir      = .
 source.include_exts = py,png,jpg,kv,atlas,json
+# 개발용 캐시/설정 파일은 APK에서 제외
+source.exclude_dirs = __pycache__,bin,.buildozer
 version         = 2.0
 
 # 의존 패키지
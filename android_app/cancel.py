@@ -0,0 +1,114 @@
+"""
+작업 취소 / 전체 제한 시간
+════════════════════════════════════════════════════════════════════════════════
+전송 한 번(Gemini 호출 → 메일 발송)을 Job 하나로 묶습니다.
+
+  - cancel()    진행 중인 HTTP/SMTP 소켓을 shutdown → 블록된 recv/send가 바로
+                깨어나고 작업자 스레드는 JobCancelled로 정상 종료.
+                끊긴 연결은 풀(urllib3 / SenderAccount)에서 버려지고 슬롯은 반환됨
+  - deadline    두 단계를 합친 전체 제한 시간(초). 지나면 cancel()과 같은 경로로
+                DeadlineExceeded
+  - 단계별 연결/읽기 타임아웃은 gemini_api / mailer 상수 — 남은 시간보다 길면
+    남은 시간으로 줄임
+
+JobCancelled는 ConnectionError가 아니므로 오프라인 대기열/서킷 브레이커에서
+네트워크 오류로 세지 않습니다.
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+
+class JobCancelled(Exception):
+    """사용자가 작업을 취소함."""
+
+
+class DeadlineExceeded(JobCancelled):
+    """작업 전체 제한 시간을 넘김."""
+
+
+def abort_socket(sock) -> None:
+    """다른 스레드에서 블록 중인 소켓 I/O를 즉시 깨웁니다 (close는 소유 스레드가)."""
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class Job:
+
+    def __init__(self, deadline: float = None):
+        self.deadline = deadline
+        self._started = time.monotonic()
+        self._error   = None          # 취소되면 올릴 예외
+        self._aborts  = {}            # 진행 중인 I/O를 끊는 함수들
+        self._lock    = threading.Lock()
+        self._timer   = None
+        if deadline:
+            self._timer = threading.Timer(deadline, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def __enter__(self) -> "Job":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._error is not None
+
+    def cancel(self, error: JobCancelled = None) -> None:
+        """어느 스레드에서나 호출 가능. 두 번째 이후 호출은 무시."""
+        with self._lock:
+            if self._error is not None:
+                return
+            self._error = error or JobCancelled("취소됨")
+            aborts = list(self._aborts.values())
+        for abort in aborts:
+            abort()
+
+    def _expire(self) -> None:
+        self.cancel(DeadlineExceeded(f"전체 제한 시간 {self.deadline:g}초 초과"))
+
+    def check(self, cause: BaseException = None) -> None:
+        """취소됐으면 JobCancelled/DeadlineExceeded (cause: 소켓을 끊어 생긴 원래 오류)."""
+        if self._error is not None:
+            raise self._error from cause
+
+    def remaining(self) -> float:
+        """남은 시간(초). 제한 시간이 없으면 None."""
+        if not self.deadline:
+            return None
+        return max(0.0, self.deadline - (time.monotonic() - self._started))
+
+    def timeout(self, connect: float, read: float) -> tuple:
+        """단계별 (연결, 읽기) 타임아웃을 남은 시간 안으로 줄입니다."""
+        self.check()
+        left = self.remaining()
+        if left is None:
+            return connect, read
+        return min(connect, left), min(read, left)
+
+    @contextmanager
+    def abort_with(self, abort):
+        """블록 안에서 cancel()되면 abort()를 호출 (보통 abort_socket)."""
+        key = object()
+        with self._lock:
+            self.check()
+            self._aborts[key] = abort
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._aborts[key]
@@ -0,0 +1,118 @@
+"""
+발송 기록 색인 (deliveries.jsonl)
+════════════════════════════════════════════════════════════════════════════════
+작업 ID(질문/대기열 항목/예약 작업)별로 보낸 메일의 Message-ID와 SMTP 응답을
+기록합니다.
+
+  - 파일은 추가 전용 JSONL — 발송 한 건당 한 줄, 기존 줄은 다시 쓰지 않음
+  - 메모리에는 작업 ID / Message-ID → 파일 오프셋만 보관
+    → 조회는 dict 조회 + seek 한 번 (기록이 아무리 많아도 O(1)),
+       메모리는 기록 수 × 키 크기 정도
+  - 쓰다가 앱이 종료돼 잘린 마지막 줄(줄바꿈 없음)만 다음 실행 때 잘라냄.
+    중간의 깨진 줄은 건너뛰고 뒤의 기록은 그대로 읽음
+
+용도:
+  - 대기열 재발송 전 중복 확인 (이미 250 응답을 받은 작업은 건너뜀)
+  - 이어지는 대화의 In-Reply-To/References 헤더 (mailer.build_message parent)
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+_HEAD_RE = re.compile(rb'\{"job_id": "([^"\\]*)", "message_id": "([^"\\]*)"')
+
+
+def _reply_text(reply) -> tuple:
+    code, text = reply if reply else (None, b"")
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", "replace")
+    return code, text
+
+
+class DeliveryIndex:
+
+    def __init__(self, path: str):
+        self._path     = path
+        self._lock     = threading.Lock()
+        self._by_job   = {}      # 작업 ID → 오프셋
+        self._by_msgid = {}      # Message-ID → 오프셋
+        self._load()
+
+    def _load(self) -> None:
+        """파일을 한 번 훑어 오프셋 색인을 만듭니다 (레코드 본문은 메모리에 두지 않음)."""
+        offset = 0
+        try:
+            with open(self._path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break          # 잘린 마지막 줄
+                    # record()가 쓴 줄은 앞 두 키만 정규식으로 — 줄 전체 JSON 파싱보다 빠름
+                    m = _HEAD_RE.match(line)
+                    if m:
+                        job_id, message_id = (g.decode("utf-8") for g in m.groups())
+                    else:
+                        try:
+                            rec = json.loads(line)
+                            job_id, message_id = rec["job_id"], rec["message_id"]
+                        except (ValueError, KeyError, TypeError):
+                            job_id = None      # 깨진 줄 — 건너뛰고 계속
+                    if job_id is not None:
+                        self._by_job[job_id]       = offset
+                        self._by_msgid[message_id] = offset
+                    offset += len(line)
+                else:
+                    return
+            with open(self._path, "r+b") as f:
+                f.truncate(offset)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._by_job)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._by_job
+
+    def _read_at(self, offset: int) -> dict:
+        with open(self._path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def get(self, job_id: str) -> dict:
+        """작업 ID의 발송 기록 (없으면 None)."""
+        offset = self._by_job.get(job_id)
+        return None if offset is None else self._read_at(offset)
+
+    def by_message_id(self, message_id: str) -> dict:
+        offset = self._by_msgid.get(message_id)
+        return None if offset is None else self._read_at(offset)
+
+    def record(self, job_id: str, msg, reply) -> dict:
+        """보낸 MIME 메시지와 DATA 응답을 기록합니다 (fsync 후 반환)."""
+        code, text = _reply_text(reply)
+        references = (msg["References"] or "").split()
+        rec = {
+            "job_id":     job_id,
+            "message_id": msg["Message-ID"],
+            "subject":    str(msg["Subject"]),
+            "sender":     msg["From"],
+            "receiver":   msg["To"],
+            "references": references,
+            "code":       code,
+            "reply":      text,
+            "sent":       time.time(),
+        }
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self._path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())   # 발송 직후 종료돼도 중복 발송하지 않도록
+            self._by_job[job_id]              = offset
+            self._by_msgid[rec["message_id"]] = offset
+        return rec
@@ -0,0 +1,211 @@
+"""
+Gemini API 호출
+════════════════════════════════════════════════════════════════════════════════
+requests 기반 네트워크 코드입니다. main.py는 첫 화면을 그린 뒤에
+이 모듈을 불러오므로 (requests/ssl/urllib3 import 비용이 첫 프레임을 늦추지
+않도록) Kivy 위젯 코드와 분리해 둡니다.
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import smtplib
+import socket
+import threading
+from contextlib import contextmanager
+
+import requests
+import urllib3
+
+from cancel import abort_socket
+from gemini_stream import extract_response
+
+# Gemini REST API 엔드포인트 (gemini-1.5-flash: 빠르고 무료 할당량 풍부)
+GEMINI_API_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/"
+    "gemini-flash-latest:generateContent"
+)
+GEMINI_MODEL_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/"
+    "{model}:generateContent"
+)
+
+# 기본 generationConfig (비교 변형은 이 값을 덮어씀)
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "maxOutputTokens": 8192,
+}
+
+# 연결 풀 크기 — 비교 모드 동시 요청 + 대기열 발송
+HTTP_POOL_SIZE = 8
+
+# 연결 타임아웃 / 읽기 타임아웃 (초) — generateContent는 응답을 다 만든 뒤에야
+# 첫 바이트를 보내므로 읽기 쪽은 길게, 연결은 짧게 (오프라인이면 바로 대기열로)
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT    = 120
+
+# 응답 본문을 읽는 청크 크기 (저사양 폰 메모리 고려)
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+
+# ── Gemini API 호출 ────────────────────────────────────────────────────────────
+
+_session = None
+_session_lock = threading.Lock()
+
+# 지금 이 스레드에서 진행 중인 call_gemini의 Job과 그 호출이 쓴 연결들
+_local = threading.local()
+
+
+class _CancellableMixin:
+    """요청을 보내기 직전에 연결을 현재 스레드의 call_gemini에 알림 — 취소 시
+    이 연결의 소켓을 끊을 수 있도록."""
+
+    def request(self, *args, **kwargs):
+        job = getattr(_local, "job", None)
+        if job is not None:
+            _local.conns.append(self)
+            job.check()
+        return super().request(*args, **kwargs)
+
+
+class _CancellableHTTPSConnection(_CancellableMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class _CancellableHTTPConnection(_CancellableMixin, urllib3.connection.HTTPConnection):
+    pass
+
+
+class _CancellableHTTPSPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _CancellableHTTPSConnection
+
+
+class _CancellableHTTPPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _CancellableHTTPConnection
+
+
+class _CancellableAdapter(requests.adapters.HTTPAdapter):
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http":  _CancellableHTTPPool,
+            "https": _CancellableHTTPSPool,
+        }
+
+
+def http_session() -> requests.Session:
+    """모든 Gemini 호출이 공유하는 Session (keep-alive 연결 풀)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = _CancellableAdapter(
+                pool_connections=1, pool_maxsize=HTTP_POOL_SIZE
+            )
+            _session.mount("https://", adapter)
+        return _session
+
+
+@contextmanager
+def _cancellable(job):
+    """블록 안의 HTTP 요청을 job.cancel()로 끊을 수 있게 합니다.
+
+    끊긴 연결은 urllib3가 닫고 풀 슬롯만 돌려받으므로 다음 요청은 새로 연결합니다.
+    """
+    if job is None:
+        yield
+        return
+    conns = []
+    _local.job, _local.conns = job, conns
+    try:
+        with job.abort_with(lambda: [abort_socket(c.sock) for c in conns]):
+            yield
+    except Exception as exc:
+        job.check(exc)      # 취소로 끊긴 것이면 JobCancelled로 바꿔 올림
+        raise
+    finally:
+        _local.job = None
+
+
+def call_gemini(
+    api_key: str,
+    prompt: str,
+    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    model: str = None,
+    generation_config: dict = None,
+    job=None,
+) -> str:
+    """Gemini REST API로 프롬프트를 전송하고 응답 텍스트를 반환합니다.
+
+    timeout: (연결, 읽기) 초 또는 둘 다 같은 값. job(cancel.Job)이 있으면 남은
+    시간 안으로 줄이고, job.cancel() 시 진행 중인 요청을 끊고 JobCancelled를 올립니다.
+    """
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    if job is not None:
+        connect, read = job.timeout(connect, read)
+    payload = {
+        "contents": [
+            {"parts": [{"text": prompt}]}
+        ],
+        "generationConfig": {**GENERATION_CONFIG, **(generation_config or {})},
+    }
+    with _cancellable(job):
+        resp = http_session().post(
+            GEMINI_MODEL_URL.format(model=model) if model else GEMINI_API_URL,
+            params={"key": api_key},
+            json=payload,
+            timeout=(connect, read),
+            stream=True,
+        )
+        with resp:
+            resp.raise_for_status()
+            # 본문 전체를 dict로 만들지 않고 필요한 텍스트만 점진적으로 추출
+            result = extract_response(resp.iter_content(chunk_size=RESPONSE_CHUNK_SIZE))
+
+    if not result.has_candidate:
+        error_msg = result.error_message or "응답 없음"
+        raise ValueError(f"Gemini 응답 없음: {error_msg}")
+
+    text = result.text
+    if not text and result.finish_reason not in (None, "STOP"):
+        raise ValueError(f"Gemini 응답 없음: finishReason={result.finish_reason}")
+    return text
+
+
+def is_network_error(exc: Exception) -> bool:
+    """연결이 돌아오면 다시 시도할 만한 오류인지 (오프라인/타임아웃/일시 과부하)."""
+    if isinstance(exc, requests.exceptions.HTTPError):
+        status = exc.response.status_code if exc.response is not None else None
+        return status == 429 or (status is not None and status >= 500)
+    return isinstance(exc, (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        socket.gaierror,
+        socket.timeout,
+        ConnectionError,
+        smtplib.SMTPServerDisconnected,
+        smtplib.SMTPConnectError,
+    ))
+
+
+def failure_reason(exc: Exception) -> str:
+    """대기열로 보내는 (다시 시도할) 오류의 상태 표시 문구."""
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return f"API HTTP 오류 {exc.response.status_code}"
+    if isinstance(exc, (requests.exceptions.Timeout, socket.timeout)):
+        return "타임아웃"
+    return "네트워크 오류"
+
+
+def error_message(exc: Exception) -> str:
+    """다시 시도해도 소용없는 오류의 상태 표시 문구."""
+    if isinstance(exc, requests.exceptions.HTTPError):
+        status = exc.response.status_code if exc.response is not None else "?"
+        if status == 400:
+            return "API 오류 400 — API 키 또는 요청 형식을 확인하세요"
+        if status == 403:
+            return "API 오류 403 — API 키 권한 없음 또는 할당량 초과"
+        return f"API HTTP 오류 {status}"
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return "이메일 인증 실패 — Gmail 앱 비밀번호를 확인하세요"
+    return f"오류: {exc}"
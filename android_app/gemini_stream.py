@@ -0,0 +1,171 @@
+"""
+Gemini 응답 스트리밍 파서
+════════════════════════════════════════════════════════════════════════════════
+generateContent 응답 본문을 청크 단위로 읽으면서 필요한 값만 뽑아냅니다:
+  - candidates[0].content.parts[*].text
+  - candidates[0].finishReason
+  - error.message
+
+resp.json()은 본문 전체를 dict 트리로 만든 뒤에야 텍스트를 꺼낼 수 있어
+응답이 크고 후보가 여러 개면 메모리 사용량이 두 배가 됩니다.
+이 파서는 경로만 추적하고 safetyRatings, 나머지 후보 등은 문자열조차
+만들지 않고 건너뜁니다. Kivy/requests에 의존하지 않습니다.
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import codecs
+import json
+import re
+
+_WS      = re.compile(r"[ \t\r\n]*")
+_LITERAL = re.compile(r"-?[0-9][0-9.eE+-]*|true|false|null")
+# 문자열 본문 — 닫는 따옴표 직전 또는 끝의 짝 없는 역슬래시 직전에서 멈춤
+_STR_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+
+# 숫자/리터럴이 이보다 길게 매칭되지 않으면 잘린 토큰이 아니라 문법 오류
+_MAX_LITERAL = 64
+
+
+class ResponseExtractor:
+    """generateContent 응답 JSON을 점진적으로 파싱해 텍스트만 모읍니다.
+
+    feed()로 디코딩된 문자열 청크를 넣고 close()로 마무리합니다.
+    """
+
+    def __init__(self):
+        self.text_parts: list = []
+        self.finish_reason = None
+        self.error_message = None
+        self.has_candidate = False
+
+        self._buf       = ""
+        self._frames    = []     # ["{", key, expecting_key] | ["[", index]
+        self._str_mode  = None   # 문자열 내부일 때: "key" | "keep" | "skip"
+        self._str_start = 0
+        self._scan      = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts).strip()
+
+    def feed(self, chunk: str) -> None:
+        self._buf += chunk
+        self._run(final=False)
+
+    def close(self) -> None:
+        self._run(final=True)
+        if self._str_mode is not None or self._frames or self._buf.strip():
+            raise ValueError("Gemini 응답 JSON이 중간에 끊겼습니다")
+
+    # ── 내부 ──────────────────────────────────────────────────────────────────
+
+    def _path(self) -> tuple:
+        return tuple(f[1] for f in self._frames)
+
+    @staticmethod
+    def _wanted(path: tuple) -> bool:
+        if path[:2] == ("candidates", 0):
+            rest = path[2:]
+            return rest == ("finishReason",) or (
+                len(rest) == 4 and rest[:2] == ("content", "parts") and rest[3] == "text"
+            )
+        return path == ("error", "message")
+
+    def _string_role(self) -> str:
+        top = self._frames[-1] if self._frames else None
+        if top is not None and top[0] == "{" and top[2]:
+            return "key"
+        return "keep" if self._wanted(self._path()) else "skip"
+
+    def _on_string(self, raw: str) -> None:
+        value = json.loads(f'"{raw}"') if "\\" in raw else raw
+        if self._str_mode == "key":
+            top = self._frames[-1]
+            top[1], top[2] = value, False
+            return
+        path = self._path()
+        if path[-1] == "text":
+            self.text_parts.append(value)
+        elif path[-1] == "finishReason":
+            self.finish_reason = value
+        else:
+            self.error_message = value
+
+    def _run(self, final: bool) -> None:
+        buf    = self._buf
+        n      = len(buf)
+        pos    = 0
+        frames = self._frames
+
+        while True:
+            if self._str_mode is not None:
+                end = _STR_BODY.match(buf, self._scan).end()
+                if end >= n or buf[end] != '"':
+                    self._scan = end
+                    break
+                if self._str_mode != "skip":
+                    self._on_string(buf[self._str_start:end])
+                self._str_mode = None
+                pos = end + 1
+                continue
+
+            pos = _WS.match(buf, pos).end()
+            if pos >= n:
+                break
+            ch = buf[pos]
+            if ch == '"':
+                self._str_mode  = self._string_role()
+                self._str_start = self._scan = pos + 1
+            elif ch == "{" or ch == "[":
+                if self._path() == ("candidates", 0):
+                    self.has_candidate = True
+                frames.append(["{", None, True] if ch == "{" else ["[", 0])
+                pos += 1
+            elif ch == "}" or ch == "]":
+                # 여는 괄호 없이 닫거나 종류가 다르면 형식 오류 (IndexError 대신)
+                if not frames or frames[-1][0] != ("{" if ch == "}" else "["):
+                    raise ValueError(f"Gemini 응답 JSON 형식 오류 (위치 {pos})")
+                frames.pop()
+                pos += 1
+            elif ch == ",":
+                if not frames:
+                    raise ValueError(f"Gemini 응답 JSON 형식 오류 (위치 {pos})")
+                top = frames[-1]
+                if top[0] == "[":
+                    top[1] += 1
+                else:
+                    top[1], top[2] = None, True
+                pos += 1
+            elif ch == ":":
+                pos += 1
+            else:
+                m = _LITERAL.match(buf, pos)
+                if m is None or (m.end() == n and not final):
+                    if final or n - pos > _MAX_LITERAL:
+                        raise ValueError(f"Gemini 응답 JSON 형식 오류 (위치 {pos})")
+                    break
+                pos = m.end()
+
+        # 소비한 앞부분 버리기 — 건너뛰는 문자열은 아직 못 읽은 부분만 남김
+        if self._str_mode is None:
+            cut = pos
+        elif self._str_mode == "skip":
+            cut = self._scan
+        else:
+            cut = self._str_start
+        self._buf = buf[cut:]
+        if self._str_mode is not None:
+            self._str_start = max(self._str_start - cut, 0)
+            self._scan     -= cut
+
+
+def extract_response(chunks) -> ResponseExtractor:
+    """UTF-8 바이트 청크 이터러블을 파싱한 ResponseExtractor를 반환합니다."""
+    decoder   = codecs.getincrementaldecoder("utf-8")()
+    extractor = ResponseExtractor()
+    for chunk in chunks:
+        if chunk:
+            extractor.feed(decoder.decode(chunk))
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor
@@ -0,0 +1,225 @@
+"""
+이메일 발송 (Gmail SMTP)
+════════════════════════════════════════════════════════════════════════════════
+Gemini 응답 메일을 구성하고 발송합니다.
+
+  - 기본: 질문 + 응답을 본문(plain + html)에 그대로 포함
+  - 첨부 모드: 응답이 attach_threshold 바이트를 넘으면 응답을 압축 파일
+    (.md.gz / .html.gz / .md.zip / .html.zip) 하나로 첨부하고,
+    본문에는 앞부분 요약만 넣습니다. 본문 두 벌(plain/html)에 응답이
+    중복되지 않아 메일 크기와 SMTP 전송 시간이 줄어듭니다.
+  - 모든 메일에 Message-ID/Date, 이어지는 대화는 In-Reply-To/References를
+    붙여 수신 메일 앱에서 한 스레드로 묶입니다.
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import gzip
+import io
+import re
+import smtplib
+import ssl
+import zipfile
+from contextlib import nullcontext
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+
+from cancel import abort_socket
+
+# Gmail SMTP 설정
+GMAIL_SMTP_HOST = "smtp.gmail.com"
+GMAIL_SMTP_PORT = 587   # STARTTLS
+GMAIL_SMTP_TLS  = True  # False는 로컬 모의 SMTP 서버용 (loadgen.py --mock)
+
+# SMTP 연결 / 읽기(명령 응답) 타임아웃 (초) — 지정하지 않으면 smtplib은 무한정 대기
+SMTP_CONNECT_TIMEOUT = 10
+SMTP_READ_TIMEOUT    = 30
+
+# 첨부 모드 기본값 (config.json의 attach_threshold / attach_format으로 변경)
+ATTACH_THRESHOLD = 64 * 1024          # 응답 UTF-8 바이트 기준, 0 이하 → 항상 본문
+ATTACH_FORMAT    = "md.gz"
+ATTACH_FORMATS   = ("md.gz", "html.gz", "md.zip", "html.zip")
+
+# 첨부 모드에서 본문에 남기는 응답 앞부분 길이 (문자)
+SUMMARY_CHARS = 600
+
+# References 헤더에 남기는 이전 메일 수 (긴 대화에서 헤더가 끝없이 커지지 않도록)
+MAX_REFERENCES = 10
+
+
+# ── 본문 구성 ──────────────────────────────────────────────────────────────────
+
+def _plain_body(prompt: str, response: str) -> str:
+    return f"[질문]\n{prompt}\n\n[Gemini 응답]\n{response}"
+
+
+def _html_body(prompt: str, response: str) -> str:
+    return f"""<html><body>
+<h3 style="color:#1a73e8">Gemini 응답</h3>
+<p><b>질문:</b><br>{prompt.replace(chr(10), '<br>')}</p>
+<hr>
+<p><b>응답:</b><br>{response.replace(chr(10), '<br>')}</p>
+</body></html>"""
+
+
+def _markdown_doc(prompt: str, response: str) -> str:
+    return f"# 질문\n\n{prompt}\n\n# Gemini 응답\n\n{response}\n"
+
+
+def format_comparison(results: list) -> str:
+    """비교 모드 결과 [(변형 이름, 응답), ...]를 하나의 응답 본문으로 합칩니다."""
+    return "\n\n".join(f"━━ {label} ━━\n{text}" for label, text in results)
+
+
+def compress_response(prompt: str, response: str, fmt: str) -> tuple:
+    """(파일명, 압축 바이트, MIME 하위 타입)"""
+    if fmt not in ATTACH_FORMATS:
+        raise ValueError(f"지원하지 않는 첨부 형식: {fmt}")
+    kind, container = fmt.split(".")
+    doc  = _markdown_doc(prompt, response) if kind == "md" else _html_body(prompt, response)
+    name = f"gemini_response.{kind}"
+    data = doc.encode("utf-8")
+
+    if container == "gz":
+        return f"{name}.gz", gzip.compress(data, compresslevel=9, mtime=0), "gzip"
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        zf.writestr(name, data)
+    return f"{name}.zip", buf.getvalue(), "zip"
+
+
+def build_message(
+    sender: str,
+    receiver: str,
+    prompt: str,
+    response: str,
+    attach_threshold: int = ATTACH_THRESHOLD,
+    attach_format: str = ATTACH_FORMAT,
+    subject: str = None,
+    keywords: list = None,
+    language: str = None,
+    parent: dict = None,
+) -> MIMEMultipart:
+    """발송할 MIME 메시지를 만듭니다 (크기 측정용으로도 사용).
+
+    subject/keywords/language는 후처리 파이프라인(postprocess.py) 결과 —
+    없으면 질문 앞 40자를 제목으로 씁니다.
+    parent는 이어지는 대화의 이전 발송 기록 (delivery_index.py) — 주어지면
+    그 메일에 대한 답장으로 스레드를 잇고 제목도 "Re: 원래 제목"으로 맞춥니다.
+    """
+    if parent:
+        subject = "Re: " + re.sub(r"^(?:Re:\s*)+", "", parent["subject"])
+    else:
+        if not subject:
+            subject = f"{prompt[:40]}{'...' if len(prompt) > 40 else ''}"
+        subject = f"[Gemini] {subject}"
+    size    = len(response.encode("utf-8"))
+
+    if attach_threshold <= 0 or size <= attach_threshold:
+        msg = MIMEMultipart("alternative")
+        msg.attach(MIMEText(_plain_body(prompt, response), "plain", "utf-8"))
+        msg.attach(MIMEText(_html_body(prompt, response),  "html",  "utf-8"))
+    else:
+        filename, data, subtype = compress_response(prompt, response, attach_format)
+        summary = (
+            f"{response[:SUMMARY_CHARS].rstrip()}\n\n"
+            f"… (전체 응답 {size:,}바이트는 첨부 파일 {filename} "
+            f"({len(data):,}바이트)을 확인하세요)"
+        )
+        body = MIMEMultipart("alternative")
+        body.attach(MIMEText(_plain_body(prompt, summary), "plain", "utf-8"))
+        body.attach(MIMEText(_html_body(prompt, summary),  "html",  "utf-8"))
+
+        attachment = MIMEApplication(data, _subtype=subtype)
+        attachment.add_header("Content-Disposition", "attachment", filename=filename)
+
+        msg = MIMEMultipart("mixed")
+        msg.attach(body)
+        msg.attach(attachment)
+
+    msg["Subject"] = subject
+    msg["From"]    = sender
+    msg["To"]      = receiver
+    msg["Date"]    = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2] or None)
+    if parent:
+        references = (parent.get("references") or []) + [parent["message_id"]]
+        msg["In-Reply-To"] = parent["message_id"]
+        msg["References"]  = " ".join(references[-MAX_REFERENCES:])
+    if keywords:
+        msg["Keywords"] = ", ".join(keywords)
+    if language and language != "und":
+        msg["Content-Language"] = language
+    return msg
+
+
+# ── 발송 ──────────────────────────────────────────────────────────────────────
+
+class TrackingSMTP(smtplib.SMTP):
+    """sendmail() 후 DATA 응답 (코드, 문구)을 last_reply에 남기는 SMTP 연결.
+
+    smtplib.sendmail()은 거부된 수신자만 반환하고 서버의 수신 확인 응답
+    (Gmail: 250 2.0.0 OK ... gsmtp)은 버리므로 여기서 붙잡아 둡니다.
+    """
+
+    last_reply   = None
+    read_timeout = None     # 연결 후 명령 응답 대기 시간 (timeout 인자는 연결에만 씀)
+
+    def _get_socket(self, host, port, timeout):
+        sock = super()._get_socket(host, port, timeout)
+        if self.read_timeout is not None:
+            sock.settimeout(self.read_timeout)   # starttls()로 감싼 소켓도 물려받음
+        return sock
+
+    def data(self, msg):
+        self.last_reply = super().data(msg)
+        return self.last_reply
+
+
+def smtp_connect(sender: str, password: str, job=None) -> TrackingSMTP:
+    """Gmail SMTP에 STARTTLS로 연결하고 로그인한 연결을 반환합니다.
+
+    job(cancel.Job)이 있으면 타임아웃을 남은 시간 안으로 줄이고,
+    핸드셰이크/로그인 중 job.cancel()되면 연결을 끊고 JobCancelled를 올립니다.
+    """
+    connect, read = SMTP_CONNECT_TIMEOUT, SMTP_READ_TIMEOUT
+    if job is not None:
+        connect, read = job.timeout(connect, read)
+    context = ssl.create_default_context()
+    server  = TrackingSMTP(timeout=connect)
+    server.read_timeout = read
+    try:
+        with job.abort_with(lambda: abort_socket(server.sock)) if job else nullcontext():
+            server.connect(GMAIL_SMTP_HOST, GMAIL_SMTP_PORT)
+            server.ehlo()
+            if GMAIL_SMTP_TLS:
+                server.starttls(context=context)
+            server.login(sender, password)
+    except Exception as exc:
+        server.close()
+        if job is not None:
+            job.check(exc)
+        raise
+    return server
+
+
+def send_email(
+    sender: str,
+    password: str,
+    receiver: str,
+    prompt: str,
+    response: str,
+    attach_threshold: int = ATTACH_THRESHOLD,
+    attach_format: str = ATTACH_FORMAT,
+) -> tuple:
+    """Gmail SMTP(STARTTLS)로 Gemini 응답을 이메일로 발송합니다.
+
+    (Message-ID, (SMTP 응답 코드, 응답 문구))를 반환합니다.
+    """
+    msg = build_message(sender, receiver, prompt, response, attach_threshold, attach_format)
+
+    with smtp_connect(sender, password) as server:
+        server.sendmail(sender, receiver, msg.as_string())
+        return msg["Message-ID"], server.last_reply
@@ -11,21 +11,27 @@ Gemini Client — Android 독립 실행 앱 (Kivy)
   - Gemini API 키
   - Gmail 발신자 이메일 + 앱 비밀번호
   - 수신자 이메일
+
+빠른 시작:
+  첫 프레임에는 입력창/버튼만 그리고, 응답 영역 위젯과 네트워크 모듈
+  (gemini_api/mailer → requests, ssl, email)은 첫 프레임 이후에 불러옵니다.
+  설정 팝업은 settings.kv로 처음 열 때 구성합니다.
+
+자격 증명:
+  API 키/앱 비밀번호는 vault.json에 암호화해 저장합니다 (vault.py).
+  복호화는 세션당 한 번, 앱이 일시정지되면 메모리에서 지웁니다.
 ════════════════════════════════════════════════════════════════════════════════
 """
 
 import json
 import os
-import smtplib
-import ssl
 import threading
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import uuid
 
-import requests
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.core.window import Window
+from kivy.lang import Builder
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
@@ -33,21 +39,56 @@ from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.textinput import TextInput
 
+from ui_bus import UiBus
+
+# 네트워크 모듈(gemini_api, mailer, offline_queue)은 첫 프레임 이후에 import
+
 # ── 설정 파일 경로 (기기 내부 저장소) ─────────────────────────────────────────
 
-CONFIG_FILE = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)), "config.json"
-)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG_FILE = os.path.join(APP_DIR, "config.json")
+
+# 오프라인 중 보낸 질문 대기열 (재시작해도 유지)
+PENDING_FILE = os.path.join(os.path.dirname(CONFIG_FILE), "pending.json")
+
+# 발송 기록 (작업 ID / Message-ID → SMTP 응답) — 추가 전용
+DELIVERY_FILE = os.path.join(os.path.dirname(CONFIG_FILE), "deliveries.jsonl")
+
+# 보낸 질문/응답 보관함 (gzip 멤버 JSONL + 색인) — 추가 전용, 내보내기/다시 보내기용
+ARCHIVE_FILE = os.path.join(os.path.dirname(CONFIG_FILE), "archive.jsonl.gz")
+
+# 발신 계정별 발송 기록/휴식 시각 (일시정지·재시작해도 한도 유지)
+SENDER_STATE_FILE = os.path.join(os.path.dirname(CONFIG_FILE), "sender_state.json")
 
-# Gemini REST API 엔드포인트 (gemini-1.5-flash: 빠르고 무료 할당량 풍부)
-GEMINI_API_URL = (
-    "https://generativelanguage.googleapis.com/v1beta/models/"
-    "gemini-flash-latest:generateContent"
-)
+# 암호화된 자격 증명 (API 키, 앱 비밀번호)
+VAULT_FILE = os.path.join(os.path.dirname(CONFIG_FILE), "vault.json")
 
-# Gmail SMTP 설정
-GMAIL_SMTP_HOST = "smtp.gmail.com"
-GMAIL_SMTP_PORT = 587   # STARTTLS
+# 비교 모드 변형 (config.json의 compare_variants로 변경)
+#   label 외의 키: model → 모델 이름, 나머지 → generationConfig 항목
+DEFAULT_COMPARE_VARIANTS = [
+    {"label": "temp 0.2", "temperature": 0.2},
+    {"label": "temp 0.7", "temperature": 0.7},
+    {"label": "temp 1.2", "temperature": 1.2},
+]
+
+# 응답 Label은 바뀔 때마다 텍스처 전체를 다시 렌더링 (긴 응답은 수십 ms) —
+# 작업자 스레드의 응답 갱신은 이 간격(초)보다 자주 그리지 않음
+RESPONSE_REDRAW_INTERVAL = 0.25
+
+# 서킷 브레이커: 이보다 오래 걸린 호출은 "느림"으로 셈 (긴 응답 생성 시간 고려)
+GEMINI_SLOW_SECONDS = 60
+SMTP_SLOW_SECONDS   = 20
+
+# 전송 한 건(Gemini 호출 + 메일 발송) 전체 제한 시간 (config.json의 job_deadline으로 변경)
+JOB_DEADLINE = 180
+
+# 후처리 파이프라인을 만들 때 보관함에서 불러올 최근 레코드 수 (파이프라인 캐시 크기)
+PIPELINE_PRIME_COUNT = 64
+
+# 메일 제목 요약 (config.json의 postprocess_summary가 "gemini"일 때만 — API 호출 1회 추가)
+SUMMARY_PROMPT      = "다음 응답을 이메일 제목으로 쓸 한 줄(40자 이내)로 요약해줘. 제목만 출력해."
+SUMMARY_INPUT_CHARS = 4000
 
 
 # ── 설정 저장/불러오기 ─────────────────────────────────────────────────────────
@@ -68,72 +109,24 @@ def save_config(data: dict) -> None:
         pass
 
 
-# ── Gemini API 호출 ────────────────────────────────────────────────────────────
+# ── 지연 로딩 헬퍼 ─────────────────────────────────────────────────────────────
+
+_loaded_kv = set()
+
+
+def load_kv(name: str) -> None:
+    """KV 파일을 처음 필요할 때 한 번만 불러옵니다."""
+    if name not in _loaded_kv:
+        Builder.load_file(os.path.join(APP_DIR, name))
+        _loaded_kv.add(name)
 
-def call_gemini(api_key: str, prompt: str, timeout: int = 120) -> str:
-    """Gemini REST API로 프롬프트를 전송하고 응답 텍스트를 반환합니다."""
-    payload = {
-        "contents": [
-            {"parts": [{"text": prompt}]}
-        ],
-        "generationConfig": {
-            "temperature": 0.7,
-            "maxOutputTokens": 8192,
-        }
-    }
-    resp = requests.post(
-        GEMINI_API_URL,
-        params={"key": api_key},
-        json=payload,
-        timeout=timeout,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-
-    # 응답 텍스트 추출
-    candidates = data.get("candidates", [])
-    if not candidates:
-        error_msg = data.get("error", {}).get("message", "응답 없음")
-        raise ValueError(f"Gemini 응답 없음: {error_msg}")
-
-    parts = candidates[0].get("content", {}).get("parts", [])
-    return "".join(p.get("text", "") for p in parts).strip()
-
-
-# ── 이메일 발송 ────────────────────────────────────────────────────────────────
-
-def send_email(
-    sender: str,
-    password: str,
-    receiver: str,
-    prompt: str,
-    response: str,
-) -> None:
-    """Gmail SMTP(STARTTLS)로 Gemini 응답을 이메일로 발송합니다."""
-    subject = f"[Gemini] {prompt[:40]}{'...' if len(prompt) > 40 else ''}"
-
-    # 본문 구성
-    plain = f"[질문]\n{prompt}\n\n[Gemini 응답]\n{response}"
-    html = f"""<html><body>
-<h3 style="color:#1a73e8">Gemini 응답</h3>
-<p><b>질문:</b><br>{prompt.replace(chr(10), '<br>')}</p>
-<hr>
-<p><b>응답:</b><br>{response.replace(chr(10), '<br>')}</p>
-</body></html>"""
-
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"]    = sender
-    msg["To"]      = receiver
-    msg.attach(MIMEText(plain, "plain", "utf-8"))
-    msg.attach(MIMEText(html,  "html",  "utf-8"))
-
-    context = ssl.create_default_context()
-    with smtplib.SMTP(GMAIL_SMTP_HOST, GMAIL_SMTP_PORT) as server:
-        server.ehlo()
-        server.starttls(context=context)
-        server.login(sender, password)
-        server.sendmail(sender, receiver, msg.as_string())
+
+def after_first_frame(callback) -> None:
+    """첫 프레임이 화면에 표시(flip)된 직후 callback()을 한 번 실행합니다."""
+    def _on_flip(*_):
+        Window.unbind(on_flip=_on_flip)
+        Clock.schedule_once(lambda dt: callback(), 0)
+    Window.bind(on_flip=_on_flip)
 
 
 # ── 설정 팝업 ──────────────────────────────────────────────────────────────────
@@ -142,90 +135,21 @@ class SettingsPopup(Popup):
     """Gemini API 키 + Gmail 설정을 입력받는 팝업."""
 
     def __init__(self, config: dict, on_save_callback, **kwargs):
+        load_kv("settings.kv")   # 위젯 구성은 settings.kv (처음 열 때 로드)
         self._cfg      = config
         self._callback = on_save_callback
+        super().__init__(**kwargs)
 
-        content = BoxLayout(orientation="vertical", padding=14, spacing=8)
-
-        def _lbl(text):
-            return Label(
-                text=text,
-                size_hint_y=None, height=26,
-                font_size="13sp",
-                color=(0.85, 0.85, 0.85, 1),
-                halign="left", valign="middle",
-            )
-
-        def _inp(hint, secret=False):
-            ti = TextInput(
-                hint_text=hint,
-                size_hint_y=None, height=42,
-                font_size="14sp",
-                background_color=(0.07, 0.07, 0.12, 1),
-                foreground_color=(0.9, 0.9, 0.9, 1),
-                multiline=False,
-                password=secret,
-            )
-            return ti
-
-        content.add_widget(_lbl("Gemini API 키"))
-        self._api_key = _inp("AIzaSy...")
-        self._api_key.text = config.get("gemini_api_key", "")
-        content.add_widget(self._api_key)
-
-        content.add_widget(_lbl("Gmail 발신자 이메일"))
-        self._sender = _inp("sender@gmail.com")
-        self._sender.text = config.get("gmail_sender", "")
-        content.add_widget(self._sender)
-
-        content.add_widget(_lbl("Gmail 앱 비밀번호 (16자리)"))
-        self._passwd = _inp("xxxx xxxx xxxx xxxx", secret=True)
-        self._passwd.text = config.get("gmail_password", "")
-        content.add_widget(self._passwd)
-
-        content.add_widget(_lbl("수신자 이메일"))
-        self._receiver = _inp("receiver@example.com")
-        self._receiver.text = config.get("gmail_receiver", "")
-        content.add_widget(self._receiver)
-
-        # 안내 문구
-        guide = Label(
-            text=(
-                "Gemini API 키: console.cloud.google.com\n"
-                "Gmail 앱 비밀번호: myaccount.google.com/apppasswords\n"
-                "(2단계 인증 활성화 필수)"
-            ),
-            size_hint_y=None, height=56,
-            font_size="11sp",
-            color=(0.55, 0.75, 0.55, 1),
-            halign="left", valign="top",
-        )
-        guide.bind(size=guide.setter("text_size"))
-        content.add_widget(guide)
+        self.ids.api_key.text  = config.get("gemini_api_key", "")
+        self.ids.sender.text   = config.get("gmail_sender", "")
+        self.ids.passwd.text   = config.get("gmail_password", "")
+        self.ids.receiver.text = config.get("gmail_receiver", "")
 
-        btns = BoxLayout(size_hint_y=None, height=46, spacing=8)
-        save_btn   = Button(text="저장",  background_color=(0.1, 0.45, 0.91, 1))
-        cancel_btn = Button(text="취소",  background_color=(0.3, 0.3, 0.3, 1))
-        btns.add_widget(save_btn)
-        btns.add_widget(cancel_btn)
-        content.add_widget(btns)
-
-        super().__init__(
-            title="설정 (API 키 & 이메일)",
-            content=content,
-            size_hint=(0.92, None),
-            height=520,
-            **kwargs,
-        )
-
-        save_btn.bind(on_press=self._on_save)
-        cancel_btn.bind(on_press=self.dismiss)
-
-    def _on_save(self, _):
-        api_key  = self._api_key.text.strip()
-        sender   = self._sender.text.strip()
-        passwd   = self._passwd.text.strip()
-        receiver = self._receiver.text.strip()
+    def _on_save(self, *_):
+        api_key  = self.ids.api_key.text.strip()
+        sender   = self.ids.sender.text.strip()
+        passwd   = self.ids.passwd.text.strip()
+        receiver = self.ids.receiver.text.strip()
 
         if not all([api_key, sender, passwd, receiver]):
             return   # 필드 미입력 시 무시
@@ -236,30 +160,137 @@ class SettingsPopup(Popup):
             "gmail_password":  passwd,
             "gmail_receiver":  receiver,
         })
-        save_config(self._cfg)
         self.dismiss()
         self._callback(self._cfg)
 
 
+# ── 비교 결과 팝업 ─────────────────────────────────────────────────────────────
+
+class ComparePopup(Popup):
+    """변형별 응답을 탭으로 보여주는 팝업. 끝난 변형부터 채워집니다."""
+
+    def __init__(self, labels: list, **kwargs):
+        from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
+
+        tabs = TabbedPanel(do_default_tab=False, tab_width=110)
+        self._labels = []
+        for label in labels:
+            item = TabbedPanelItem(text=label, font_size="12sp")
+            scroll = ScrollView()
+            lbl = Label(
+                text="응답 대기 중...",
+                font_size="14sp",
+                color=(0.78, 0.78, 0.78, 1),
+                halign="left", valign="top",
+                size_hint_y=None,
+            )
+            lbl.bind(
+                width=lambda w, *_: w.setter("text_size")(w, (w.width, None)),
+                texture_size=lambda w, *_: w.setter("height")(w, w.texture_size[1]),
+            )
+            scroll.add_widget(lbl)
+            item.add_widget(scroll)
+            tabs.add_widget(item)
+            self._labels.append(lbl)
+        if tabs.tab_list:
+            tabs.switch_to(tabs.tab_list[-1])   # tab_list는 역순 → 첫 변형
+
+        super().__init__(
+            title="비교 결과",
+            content=tabs,
+            size_hint=(0.96, 0.9),
+            **kwargs,
+        )
+
+    def show_result(self, index: int, text: str):
+        self._labels[index].text = text or "(응답 없음)"
+
+
 # ── 메인 레이아웃 ──────────────────────────────────────────────────────────────
 
 class GeminiLayout(BoxLayout):
 
     def __init__(self, **kwargs):
         super().__init__(orientation="vertical", padding=16, spacing=10, **kwargs)
-        self._config = load_config()
+        self._config  = load_config()    # vault 사용 시 비밀 값이 빠진 공개 설정
+        self._vault   = None
+        self._pending = None
+        self._drainer = None
+        self._deliveries   = None
+        self._archive      = None
+        self._breakers     = {}          # 백엔드 이름 → CircuitBreaker
+        self._job          = None        # 진행 중인 전송 (cancel.Job) — 취소 버튼용
+        self._conversation = None        # 현재 대화의 마지막 작업 ID (메일 스레드)
+        self._sender_pool = None
+        self._sender_accounts = None     # 풀을 만든 계정 목록 (바뀌면 다시 만듦)
+        self._network_ready = False      # _load_network 완료 (발송 가능)
+        self._pipeline    = None
+        self._pool_lock   = threading.Lock()
+        # 작업자 스레드 → UI 변경 (프레임당 1회 적용, 응답 본문은 간격 두고)
+        self._ui          = UiBus(intervals={"response": RESPONSE_REDRAW_INTERVAL})
         self._build_ui()
 
+        # 첫 프레임 이후: 응답 영역 구성 + 네트워크 모듈 로드
+        after_first_frame(self._finish_startup)
+
+    def _finish_startup(self):
+        self._build_response_area()
+        threading.Thread(target=self._load_network, daemon=True).start()
+
+    def _load_network(self):
+        """requests/ssl/email import는 백그라운드 스레드에서 (UI 멈춤 없음)."""
+        from archive import Archive
+        from breaker import CircuitBreaker
+        from delivery_index import DeliveryIndex
+        from gemini_api import is_network_error
+        from offline_queue import PendingQueue, QueueDrainer
+        from sender_pool import SenderPoolExhausted   # mailer(email 패키지)도 함께 로드
+
+        # 자격 증명 복호화(PBKDF2/키스토어)도 여기서 — 첫 요청에 지연이 붙지 않음
+        self._open_vault()
+
+        self._deliveries = DeliveryIndex(DELIVERY_FILE)
+        self._archive    = Archive(ARCHIVE_FILE)
+
+        # 백엔드가 죽으면 타임아웃을 기다리지 않고 바로 대기열로
+        self._breakers = {
+            name: CircuitBreaker(
+                name,
+                is_failure=is_network_error,
+                slow_seconds=slow,
+                on_change=self._on_breaker_change,
+            )
+            for name, slow in (("Gemini", GEMINI_SLOW_SECONDS), ("SMTP", SMTP_SLOW_SECONDS))
+        }
+
+        # 오프라인 대기열 — 연결이 돌아오면 자동 발송
+        self._pending = PendingQueue(PENDING_FILE)
+        self._drainer = QueueDrainer(
+            self._pending,
+            deliver=self._deliver_pending,
+            is_retryable=lambda exc: (
+                is_network_error(exc) or isinstance(exc, SenderPoolExhausted)
+            ),
+            on_event=self._on_pending_event,
+        )
+        self._drainer.start()
+        Clock.schedule_once(lambda dt: self._on_network_ready())
+
+    def _on_network_ready(self):
+        self._network_ready       = True
+        self._resend_btn.disabled = False
         # 설정 미완료 시 설정 팝업 자동 표시
         if not self._is_configured():
-            Clock.schedule_once(lambda dt: self._open_settings(), 0.5)
+            self._set_status("설정을 완료해 주세요")
+            self._open_settings()
         else:
             self._set_status("준비 완료 — 질문을 입력하세요")
-            self._send_btn.disabled = False
+            self._set_busy(False)
 
     # ── UI 구성 ───────────────────────────────────────────────────────────────
 
     def _build_ui(self):
+        """첫 프레임에 필요한 위젯만 구성합니다 (헤더/상태/입력/버튼)."""
         Window.clearcolor = (0.10, 0.10, 0.16, 1)
 
         # ── 헤더 ──
@@ -286,14 +317,27 @@ class GeminiLayout(BoxLayout):
 
         # ── 상태 표시 ──
         self._status_lbl = Label(
-            text="설정을 완료해 주세요",
-            size_hint_y=None, height=30,
+            text="시작 중...",
             font_size="13sp",
             color=(0.6, 0.6, 0.6, 1),
             halign="left", valign="middle",
         )
         self._status_lbl.bind(size=self._status_lbl.setter("text_size"))
-        self.add_widget(self._status_lbl)
+
+        # 서킷 브레이커가 열렸을 때만 표시 (정상이면 빈 칸)
+        self._breaker_lbl = Label(
+            text="",
+            size_hint=(None, 1), width=150,
+            font_size="12sp",
+            markup=True,
+            halign="right", valign="middle",
+        )
+        self._breaker_lbl.bind(size=self._breaker_lbl.setter("text_size"))
+
+        status_row = BoxLayout(size_hint_y=None, height=30, spacing=8)
+        status_row.add_widget(self._status_lbl)
+        status_row.add_widget(self._breaker_lbl)
+        self.add_widget(status_row)
 
         # ── 질문 입력창 ──
         q_label = Label(
@@ -321,16 +365,41 @@ class GeminiLayout(BoxLayout):
         # ── 전송 버튼 ──
         self._send_btn = Button(
             text="Gemini에 전송하고 메일 발송",
-            size_hint_y=None, height=54,
             font_size="16sp", bold=True,
             background_color=(0.1, 0.45, 0.91, 1),
             color=(1, 1, 1, 1),
             disabled=True,
         )
         self._send_btn.bind(on_press=self._on_send)
-        self.add_widget(self._send_btn)
 
-        # ── 응답 영역 ──
+        self._compare_btn = Button(
+            text="비교",
+            size_hint=(None, 1), width=90,
+            font_size="15sp", bold=True,
+            background_color=(0.25, 0.25, 0.38, 1),
+            color=(1, 1, 1, 1),
+            disabled=True,
+        )
+        self._compare_btn.bind(on_press=self._on_compare)
+
+        self._cancel_btn = Button(
+            text="취소",
+            size_hint=(None, 1), width=90,
+            font_size="15sp", bold=True,
+            background_color=(0.6, 0.2, 0.2, 1),
+            color=(1, 1, 1, 1),
+            disabled=True,
+        )
+        self._cancel_btn.bind(on_press=self._on_cancel)
+
+        send_row = BoxLayout(size_hint_y=None, height=54, spacing=8)
+        send_row.add_widget(self._send_btn)
+        send_row.add_widget(self._compare_btn)
+        send_row.add_widget(self._cancel_btn)
+        self.add_widget(send_row)
+
+    def _build_response_area(self):
+        """응답 영역은 첫 프레임 이후에 구성합니다."""
         resp_header = BoxLayout(size_hint_y=None, height=34, spacing=8)
         resp_lbl = Label(
             text="Gemini 응답",
@@ -350,6 +419,28 @@ class GeminiLayout(BoxLayout):
         )
         copy_btn.bind(on_press=self._copy_response)
         resp_header.add_widget(copy_btn)
+
+        new_btn = Button(
+            text="새 대화",
+            size_hint=(None, 1), width=80,
+            font_size="13sp",
+            background_color=(0.25, 0.25, 0.38, 1),
+            color=(0.88, 0.88, 0.88, 1),
+        )
+        new_btn.bind(on_press=self._new_conversation)
+        resp_header.add_widget(new_btn)
+
+        # 보관함/대기열은 네트워크 모듈 로드 후 생김 — 그때까지 비활성
+        self._resend_btn = Button(
+            text="다시 보내기",
+            size_hint=(None, 1), width=100,
+            font_size="13sp",
+            background_color=(0.25, 0.25, 0.38, 1),
+            color=(0.88, 0.88, 0.88, 1),
+            disabled=True,
+        )
+        self._resend_btn.bind(on_press=self._on_resend)
+        resp_header.add_widget(self._resend_btn)
         self.add_widget(resp_header)
 
         scroll = ScrollView()
@@ -372,19 +463,94 @@ class GeminiLayout(BoxLayout):
         scroll.add_widget(self._response_lbl)
         self.add_widget(scroll)
 
+    # ── 자격 증명 ─────────────────────────────────────────────────────────────
+
+    def _open_vault(self):
+        """vault를 열고 config.json에 남아 있던 평문 비밀 값을 옮깁니다."""
+        from vault import CredentialVault, default_key_source, split_secrets
+
+        source = default_key_source()
+        if source is None:
+            return      # 키 출처 없음 → 이전처럼 config.json 평문
+        vault = CredentialVault(VAULT_FILE, source)
+        try:
+            public, plain = split_secrets(self._config)
+            if plain:
+                secrets = vault.secrets()
+                secrets.update({k: v for k, v in plain.items() if k != "sender_passwords"})
+                secrets.setdefault("sender_passwords", {}).update(plain.get("sender_passwords", {}))
+                vault.store(secrets)
+                save_config(public)
+                self._config = public
+            vault.secrets()             # 세션 캐시 채우기
+        except Exception as exc:
+            msg = f"자격 증명 보관소 오류 — 평문 설정 사용: {exc}"
+            self._post_status(msg, error=True)
+            return
+        self._vault = vault
+
+    def _secret(self, name: str) -> str:
+        if self._vault is None:
+            return self._config.get(name, "")
+        return self._vault.get(name)
+
+    def _full_config(self) -> dict:
+        """비밀 값까지 합친 설정 (설정 팝업/발신 계정 풀 생성용)."""
+        if self._vault is None:
+            return self._config
+        from vault import merge_secrets
+        return merge_secrets(self._config, self._vault.secrets())
+
+    def _store_config(self, cfg: dict):
+        if self._vault is None:
+            save_config(cfg)
+            self._config = cfg
+            return
+        from vault import split_secrets
+
+        public, secrets = split_secrets(cfg)
+        self._vault.store(secrets)
+        save_config(public)
+        self._config = public
+
+    def _on_app_pause(self):
+        """앱이 백그라운드로 가면 복호화된 값과 로그인된 SMTP 연결을 버립니다.
+
+        대기열 발송은 멈춤 (다시 복호화하지 않도록). 발신 계정 풀(발송 기록,
+        휴식 시각)은 그대로 두고 파일에도 저장합니다 — 진행 중인 발송이 끝나길
+        기다릴 수 있으므로 작업자 스레드에서.
+        """
+        if self._drainer is not None:
+            self._drainer.pause()
+        if self._vault is not None:
+            self._vault.wipe()
+        self._close_sender_connections_async()
+
+    def _on_app_resume(self):
+        if self._vault is not None:
+            threading.Thread(target=self._vault.secrets, daemon=True).start()
+        if self._drainer is not None:
+            self._drainer.resume()
+
     # ── 설정 팝업 ─────────────────────────────────────────────────────────────
 
     def _open_settings(self):
         def _on_saved(cfg):
-            self._config = cfg
+            self._store_config(cfg)
+            self._reset_pipeline()      # 발신 계정 풀은 계정 목록이 바뀌었을 때만 다시 만듦
+            if not self._network_ready:
+                # 전송 버튼은 _on_network_ready가 켬 (대기열/브레이커가 아직 없음)
+                self._set_status("설정 완료 — 준비 중…")
+                return
             self._set_status("설정 완료 — 질문을 입력하세요")
-            self._send_btn.disabled = False
+            self._set_busy(False)
 
-        SettingsPopup(self._config, _on_saved).open()
+        SettingsPopup(self._full_config(), _on_saved).open()
 
     def _is_configured(self) -> bool:
-        required = ["gemini_api_key", "gmail_sender", "gmail_password", "gmail_receiver"]
-        return all(self._config.get(k) for k in required)
+        cfg = self._full_config()
+        has_sender = cfg.get("gmail_senders") or (cfg.get("gmail_sender") and cfg.get("gmail_password"))
+        return bool(cfg.get("gemini_api_key") and cfg.get("gmail_receiver") and has_sender)
 
     # ── 전송 ─────────────────────────────────────────────────────────────────
 
@@ -394,72 +560,385 @@ class GeminiLayout(BoxLayout):
             self._set_status("질문을 입력해주세요", error=True)
             return
 
-        self._send_btn.disabled = True
+        job = self._start_job()
         self._input.text = ""
         self._response_lbl.text = ""
         self._set_status("Gemini에 요청 중...")
-        threading.Thread(target=self._process, args=(prompt,), daemon=True).start()
-
-    def _process(self, prompt: str):
-        cfg = self._config
+        threading.Thread(target=self._process, args=(prompt, job), daemon=True).start()
+
+    def _start_job(self):
+        from cancel import Job
+
+        self._job = Job(deadline=float(self._config.get("job_deadline", JOB_DEADLINE)))
+        self._set_busy(True)
+        return self._job
+
+    def _on_cancel(self, _):
+        if self._job is not None:
+            self._job.cancel()
+            self._set_status("취소 중...")
+
+    def _process(self, prompt: str, job):
+        from breaker import CircuitOpen
+        from cancel import DeadlineExceeded, JobCancelled
+        from gemini_api import error_message, failure_reason, is_network_error
+        from sender_pool import SenderPoolExhausted
+
+        cfg      = self._config
+        job_id   = uuid.uuid4().hex
+        parent   = self._conversation
+        response = None
         try:
             # 1단계: Gemini API 호출
-            Clock.schedule_once(lambda dt: self._set_status("Gemini 응답 수신 중..."))
-            response = call_gemini(cfg["gemini_api_key"], prompt)
+            self._post_status("Gemini 응답 수신 중...")
+            response = self._call_gemini(prompt, job=job)
 
             # UI에 응답 표시
-            Clock.schedule_once(lambda dt: self._show_response(response))
+            self._ui.post("response", self._show_response, response)
 
             # 2단계: 이메일 발송
-            Clock.schedule_once(lambda dt: self._set_status("이메일 발송 중..."))
-            send_email(
-                sender=cfg["gmail_sender"],
-                password=cfg["gmail_password"],
-                receiver=cfg["gmail_receiver"],
-                prompt=prompt,
-                response=response,
+            self._post_status("이메일 발송 중...")
+            self._send_mail(job_id, prompt, response, parent, job)
+            self._post_status(f"완료 — 메일 발송: {cfg['gmail_receiver']}")
+
+        except DeadlineExceeded as exc:
+            self._post_status(f"타임아웃 — {exc}", error=True)
+
+        except JobCancelled:
+            self._post_status(
+                "취소됨" if response is None else "취소됨 — 응답은 받았지만 메일은 보내지 않았습니다"
             )
-            Clock.schedule_once(lambda dt: self._set_status(
-                f"완료 — 메일 발송: {cfg['gmail_receiver']}"
-            ))
-
-        except requests.exceptions.HTTPError as e:
-            status = e.response.status_code if e.response else "?"
-            if status == 400:
-                msg = "API 오류 400 — API 키 또는 요청 형식을 확인하세요"
-            elif status == 403:
-                msg = "API 오류 403 — API 키 권한 없음 또는 할당량 초과"
+
+        except CircuitOpen as exc:
+            # 백엔드 차단 중 — 타임아웃을 기다리지 않고 바로 대기열로
+            self._enqueue_pending(prompt, response, parent, reason=str(exc))
+
+        except SenderPoolExhausted as exc:
+            # 모든 계정이 한도/휴식 중 — 대기열이 가능해지는 대로 다시 보냄
+            self._enqueue_pending(prompt, response, parent, reason=str(exc))
+
+        except Exception as exc:
+            # 재시도할 만한 오류(연결/타임아웃/429·5xx)는 브레이커·대기열과 같은 기준
+            # (is_network_error)으로 대기열에 — 이미 받은 응답을 버리지 않음
+            if is_network_error(exc):
+                self._enqueue_pending(prompt, response, parent, reason=failure_reason(exc))
             else:
-                msg = f"API HTTP 오류 {status}"
-            Clock.schedule_once(lambda dt: self._set_status(msg, error=True))
+                self._post_status(error_message(exc), error=True)
 
-        except requests.exceptions.ConnectionError:
-            Clock.schedule_once(lambda dt: self._set_status(
-                "네트워크 오류 — 인터넷 연결을 확인하세요", error=True
-            ))
+        finally:
+            job.close()
+            self._post_busy(False)
 
-        except requests.exceptions.Timeout:
-            Clock.schedule_once(lambda dt: self._set_status(
-                "타임아웃 — 응답이 너무 오래 걸립니다. 다시 시도하세요", error=True
-            ))
+    # ── 비교 (여러 generationConfig 동시 실행) ─────────────────────────────
 
-        except smtplib.SMTPAuthenticationError:
-            Clock.schedule_once(lambda dt: self._set_status(
-                "이메일 인증 실패 — Gmail 앱 비밀번호를 확인하세요", error=True
-            ))
+    def _on_compare(self, _):
+        prompt = self._input.text.strip()
+        if not prompt:
+            self._set_status("질문을 입력해주세요", error=True)
+            return
+
+        variants = self._config.get("compare_variants") or DEFAULT_COMPARE_VARIANTS
+        popup = ComparePopup([v.get("label", f"변형 {i + 1}") for i, v in enumerate(variants)])
+        popup.open()
+
+        job = self._start_job()
+        self._input.text = ""
+        self._set_status(f"비교 요청 중... (0/{len(variants)})")
+        threading.Thread(
+            target=self._process_compare, args=(prompt, variants, popup, job), daemon=True
+        ).start()
+
+    def _run_variant(self, prompt: str, variant: dict, job) -> str:
+        overrides = {k: v for k, v in variant.items() if k not in ("label", "model")}
+        return self._call_gemini(
+            prompt,
+            model=variant.get("model"),
+            generation_config=overrides,
+            job=job,
+        )
+
+    def _process_compare(self, prompt: str, variants: list, popup, job):
+        """모든 변형을 동시에 호출 — 총 소요 시간은 가장 느린 변형 기준."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        from breaker import CircuitOpen
+        from cancel import JobCancelled
+        from gemini_api import HTTP_POOL_SIZE, error_message, failure_reason, is_network_error
+        from mailer import format_comparison
+        from sender_pool import SenderPoolExhausted
+
+        cfg     = self._config
+        job_id  = uuid.uuid4().hex
+        parent  = self._conversation
+        results = [None] * len(variants)
+        errors  = []
+        report  = None
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(variants), HTTP_POOL_SIZE)) as pool:
+                futures = {
+                    pool.submit(self._run_variant, prompt, v, job): i
+                    for i, v in enumerate(variants)
+                }
+                for done, fut in enumerate(as_completed(futures), 1):
+                    i = futures[fut]
+                    try:
+                        text, ok = fut.result(), True
+                    except Exception as exc:
+                        text, ok = f"(오류: {exc})", False
+                        errors.append(exc)
+                    results[i] = (variants[i].get("label", f"변형 {i + 1}"), text, ok)
+                    self._ui.post(("compare", id(popup), i), popup.show_result, i, text)
+                    self._post_status(f"비교 요청 중... ({done}/{len(variants)})")
+
+            job.check()
+            if not any(ok for _, _, ok in results):
+                if all(isinstance(e, CircuitOpen) or is_network_error(e) for e in errors):
+                    # 입력창은 이미 비웠으므로 질문을 일반 대기열 항목으로 보존
+                    first  = errors[0]
+                    reason = str(first) if isinstance(first, CircuitOpen) else failure_reason(first)
+                    self._enqueue_pending(prompt, None, parent, reason=f"비교 실패 ({reason})")
+                    return
+                self._post_status(
+                    "비교 실패 — 모든 변형에서 오류가 발생했습니다", error=True
+                )
+                return
+
+            self._post_status("이메일 발송 중...")
+            report = format_comparison([(l, t) for l, t, _ in results])
+            self._send_mail(job_id, prompt, report, parent, job)
+            self._post_status(
+                f"완료 — 비교 결과 메일 발송: {cfg['gmail_receiver']}"
+            )
+
+        except JobCancelled as exc:
+            self._post_status(f"비교 {exc}", error=True)
+
+        except (CircuitOpen, SenderPoolExhausted) as exc:
+            # 메일 발송 단계 — 비교 결과 전체를 대기열로
+            self._enqueue_pending(prompt, report, parent, reason=str(exc))
 
         except Exception as exc:
-            Clock.schedule_once(lambda dt: self._set_status(
-                f"오류: {exc}", error=True
-            ))
+            if report is not None and is_network_error(exc):
+                self._enqueue_pending(prompt, report, parent, reason=failure_reason(exc))
+            else:
+                self._post_status(error_message(exc), error=True)
 
         finally:
+            job.close()
+            self._post_busy(False)
+
+    def _call_gemini(self, prompt: str, **kwargs) -> str:
+        """모든 Gemini 호출은 Gemini 브레이커를 거칩니다 (열려 있으면 CircuitOpen)."""
+        from gemini_api import call_gemini
+
+        return self._breakers["Gemini"].call(
+            call_gemini, self._secret("gemini_api_key"), prompt, **kwargs
+        )
+
+    def _send_mail(self, job_id: str, prompt: str, response: str, parent: str = None,
+                   job=None):
+        """발송 후 작업 ID → Message-ID/SMTP 응답을 기록하고, 이 메일을 현재 대화의
+        마지막 메일로 삼습니다 (parent: 답장으로 이어 붙일 이전 작업 ID,
+        job: 취소/제한 시간 — 대기열 발송은 None)."""
+        from mailer import ATTACH_FORMAT, ATTACH_THRESHOLD, build_message
+
+        cfg      = self._config
+        stages   = self._postprocess_stages()
+        receiver = cfg["gmail_receiver"]
+        post     = self._postprocess(response)
+        previous = self._deliveries.get(parent) if parent else None
+        _, msg, reply = self._breakers["SMTP"].call(
+            self._get_sender_pool().send, receiver, lambda sender: build_message(
+                sender,
+                receiver,
+                prompt,
+                post.get("redact", response),
+                attach_threshold=int(cfg.get("attach_threshold", ATTACH_THRESHOLD)),
+                attach_format=cfg.get("attach_format", ATTACH_FORMAT),
+                subject=post.get("subject"),
+                keywords=post.get("keywords"),
+                language=post.get("language"),
+                parent=previous,
+            ),
+            job,
+        )
+        self._deliveries.record(job_id, msg, reply)
+        self._archive.append(job_id, {
+            "prompt":     prompt,
+            "response":   response,
+            "parent":     parent,
+            "message_id": msg["Message-ID"],
+            "stages":     list(stages),
+            # 가린 응답(redact)은 다시 계산하기 싸므로 작은 결과만 보관
+            "post":       {k: v for k, v in post.items() if k != "redact"},
+        })
+        if self._conversation == parent:
+            self._conversation = job_id
+
+    def _postprocess_stages(self) -> list:
+        from postprocess import DEFAULT_STAGES
+
+        return self._config.get("postprocess", DEFAULT_STAGES)
+
+    def _postprocess(self, response: str) -> dict:
+        """메일 발송 전 후처리 (작업자 스레드). 단계는 config의 postprocess로 선택."""
+        enabled = self._postprocess_stages()
+        if not enabled:
+            return {}
+        return self._get_pipeline().run(response, enabled)
+
+    def _get_pipeline(self):
+        """후처리 파이프라인 (응답 해시별 결과 캐시 유지)."""
+        from postprocess import Pipeline, default_stages
+
+        with self._pool_lock:
+            if self._pipeline is not None:
+                return self._pipeline
+            summarize = None
+            if self._config.get("postprocess_summary") == "gemini":
+                summarize = self._summarize_with_gemini
+            pipeline = self._pipeline = Pipeline(default_stages(summarize))
+        # 최근 보관 레코드의 제목/키워드로 캐시를 채움 (다시 보내기 때 요약 생략)
+        # — 잠금 밖에서 레코드 하나씩 (발송 풀을 기다리게 하지 않음)
+        for record in self._archive.recent(PIPELINE_PRIME_COUNT):
+            self._prime_pipeline(pipeline, record)
+        return pipeline
+
+    def _prime_pipeline(self, pipeline, record: dict):
+        stages = self._postprocess_stages()
+        if record.get("stages") == list(stages):   # 단계 조합이 다르면 결과도 다름
+            pipeline.prime(record["response"], record.get("post", {}), stages)
+
+    def _summarize_with_gemini(self, text: str) -> str:
+        return self._call_gemini(
+            f"{SUMMARY_PROMPT}\n\n{text[:SUMMARY_INPUT_CHARS]}",
+            timeout=20,
+            generation_config={"temperature": 0.2, "maxOutputTokens": 64},
+        )
+
+    def _get_sender_pool(self):
+        """발신 계정 풀 (계정별 SMTP 연결 유지). 계정 목록이 바뀌면 새로 만들고
+        같은 주소의 발송 기록/휴식 시각은 이어받습니다."""
+        from sender_pool import SenderPool, account_entries
+
+        cfg = self._full_config()
+        with self._pool_lock:
+            entries = account_entries(cfg)
+            old     = self._sender_pool
+            if old is not None and entries == self._sender_accounts:
+                return old
+            pool = SenderPool.from_config(cfg)
+            pool.restore(old.state() if old is not None else self._load_sender_state())
+            self._sender_pool, self._sender_accounts = pool, entries
+        if old is not None:
+            old.close()
+        return pool
+
+    def _load_sender_state(self) -> dict:
+        try:
+            with open(SENDER_STATE_FILE, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _close_sender_connections_async(self):
+        # daemon 아님 — 앱 종료 중이어도 발송 기록 저장까지 마침
+        threading.Thread(target=self._close_sender_connections).start()
+
+    def _close_sender_connections(self):
+        """로그인된 SMTP 연결만 닫고, 계정별 발송 기록/휴식 시각은 저장합니다."""
+        with self._pool_lock:
+            pool = self._sender_pool
+        if pool is None:
+            return
+        pool.close()
+        tmp = SENDER_STATE_FILE + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(pool.state(), f)
+            os.replace(tmp, SENDER_STATE_FILE)
+        except OSError:
+            pass
+
+    def _reset_pipeline(self):
+        with self._pool_lock:
+            pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            pipeline.close()
+
+    # ── 오프라인 대기열 ──────────────────────────────────────────────────────
+
+    def _enqueue_pending(self, prompt: str, response, parent: str = None,
+                         reason: str = "네트워크 오류"):
+        self._pending.add(prompt, response, parent)
+        self._drainer.kick()
+        count = len(self._pending)
+        self._post_status(
+            f"{reason} — 대기열에 저장됨 ({count}건), 연결되면 자동 발송", error=True
+        )
+
+    def _deliver_pending(self, item: dict):
+        """대기열 항목 처리 (QueueDrainer 작업자 스레드)."""
+        if item["id"] in self._deliveries:
+            return      # 이미 발송됨 (발송 직후 대기열에서 지우기 전에 종료된 경우)
+        if item.get("resend") and item.get("response") is None:
+            # 다시 보내기 — 보관함 조회와 후처리 캐시 채우기는 여기(작업자 스레드)서
+            record = self._archive.get(item["resend"])
+            if record is None:
+                raise ValueError(f"보관함에 없는 메일: {item['resend']}")
+            self._prime_pipeline(self._get_pipeline(), record)
+            item["prompt"], item["response"] = record["prompt"], record["response"]
+        if item.get("response") is None:
+            item["response"] = self._call_gemini(item["prompt"])
+        self._send_mail(item["id"], item["prompt"], item["response"], item.get("parent"))
+
+    def _on_pending_event(self, kind: str, item: dict, exc):
+        left = len(self._pending)
+        if kind == "sent":
+            msg, error = f"완료 — 대기열 메일 발송 (남은 {left}건)", False
+        else:
+            msg, error = f"대기열 항목 폐기: {exc}", True
+        self._post_status(msg, error=error)
+
+    # ── 서킷 브레이커 표시 ───────────────────────────────────────────────────
+
+    def _on_breaker_change(self, breaker):
+        """브레이커 상태가 바뀔 때 (작업자 스레드). open이면 half-open 시각에 다시 표시."""
+        from breaker import OPEN
+
+        self._ui.post("breakers", self._show_breakers)
+        if breaker.state == OPEN:
             Clock.schedule_once(
-                lambda dt: setattr(self._send_btn, "disabled", False)
+                lambda dt: self._ui.post("breakers", self._show_breakers),
+                breaker.retry_in() + 0.1,
             )
 
+    def _show_breakers(self):
+        from breaker import OPEN
+
+        parts = []
+        for name, breaker in self._breakers.items():
+            state = breaker.state
+            if state == OPEN:
+                parts.append(f"[color=ff5a47]{name} 차단[/color]")
+            elif state != "closed":
+                parts.append(f"[color=f0c040]{name} 시험 중[/color]")
+        self._breaker_lbl.text = "  ".join(parts)
+
     # ── UI 헬퍼 ──────────────────────────────────────────────────────────────
 
+    def _post_status(self, msg: str, error: bool = False):
+        """작업자 스레드용 — 같은 프레임 안의 상태 변경은 마지막 것만 그립니다."""
+        self._ui.post("status", self._set_status, msg, error)
+
+    def _post_busy(self, busy: bool):
+        self._ui.post("busy", self._set_busy, busy)
+
+    def _set_busy(self, busy: bool):
+        self._send_btn.disabled    = busy
+        self._compare_btn.disabled = busy
+        self._cancel_btn.disabled  = not busy
+
     def _set_status(self, msg: str, error: bool = False):
         self._status_lbl.text  = msg
         self._status_lbl.color = (1, 0.35, 0.28, 1) if error else (0.5, 0.85, 0.5, 1) if "완료" in msg else (0.6, 0.6, 0.6, 1)
@@ -467,6 +946,21 @@ class GeminiLayout(BoxLayout):
     def _show_response(self, text: str):
         self._response_lbl.text = text or "(응답 없음)"
 
+    def _on_resend(self, _):
+        """현재 대화의 마지막 메일을 보관함에서 꺼내 답장으로 다시 보냅니다 (대기열 경유)."""
+        record_id = self._conversation
+        if record_id is None or record_id not in self._archive:
+            self._set_status("다시 보낼 메일이 없습니다", error=True)
+            return
+        # 보관함 읽기/파이프라인 준비는 _deliver_pending에서 (UI 스레드는 대기열 추가만)
+        self._pending.add("", parent=record_id, resend=record_id)
+        self._drainer.kick()
+        self._set_status("다시 보내기 — 대기열에 추가됨")
+
+    def _new_conversation(self, _):
+        self._conversation = None
+        self._set_status("새 대화 — 다음 메일부터 새 스레드로 발송")
+
     def _copy_response(self, _):
         from kivy.core.clipboard import Clipboard
         txt = self._response_lbl.text
@@ -482,6 +976,17 @@ class GeminiApp(App):
         self.title = "Gemini 클라이언트"
         return GeminiLayout()
 
+    def on_pause(self):
+        self.root._on_app_pause()
+        return True
+
+    def on_resume(self):
+        self.root._on_app_resume()
+
+    def on_stop(self):
+        # 계정별로 열어둔 SMTP 연결 정리 (발송 기록은 저장)
+        self.root._close_sender_connections_async()
+
 
 if __name__ == "__main__":
     GeminiApp().run()
@@ -0,0 +1,216 @@
+"""
+오프라인 대기열
+════════════════════════════════════════════════════════════════════════════════
+네트워크가 없을 때 보낸 질문을 파일(pending.json)에 보관했다가
+연결이 돌아오면 Gemini 호출 → 이메일 발송을 다시 수행합니다.
+
+  PendingQueue  — 재시작해도 유지되는 대기열 (JSON 파일, 원자적 저장)
+  probe_online  — 443 포트 TCP 연결만 시도하는 가벼운 연결 확인
+  QueueDrainer  — 백그라운드 스레드: 연결 확인 → 동시 실행 수 제한 발송
+                  → 실패 시 지수 백오프(+지터). pause() 동안은 새 항목을 시작하지
+                  않음 (앱이 백그라운드일 때 — 자격 증명 재복호화 방지)
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+PROBE_HOST = "generativelanguage.googleapis.com"
+PROBE_PORT = 443
+
+
+def probe_online(host: str = PROBE_HOST, port: int = PROBE_PORT, timeout: float = 3.0) -> bool:
+    """TCP 연결만 맺어보고 닫습니다 (HTTP 요청/할당량 소모 없음)."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+# ── 대기열 ────────────────────────────────────────────────────────────────────
+
+class PendingQueue:
+    """발송 대기 중인 질문 목록.
+
+    항목: {"id", "prompt", "response", "parent", "created", "attempts"}
+    id는 발송 기록(delivery_index.py)의 작업 ID로도 쓰이고, parent는 이어지는
+    대화의 이전 작업 ID입니다.
+    """
+
+    def __init__(self, path: str):
+        self._path  = path
+        self._lock  = threading.Lock()
+        self._items = self._load()
+
+    def _load(self) -> list:
+        try:
+            with open(self._path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return []
+
+    def _save(self) -> None:
+        tmp = self._path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self._items, f, ensure_ascii=False)
+            os.replace(tmp, self._path)
+        except Exception:
+            pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def add(self, prompt: str, response: str = None, parent: str = None,
+            resend: str = None) -> dict:
+        """resend: 보관함 레코드 ID — 질문/응답은 발송할 때 보관함에서 채움."""
+        item = {
+            "id":       uuid.uuid4().hex,
+            "prompt":   prompt,
+            "response": response,
+            "parent":   parent,
+            "resend":   resend,
+            "created":  time.time(),
+            "attempts": 0,
+        }
+        with self._lock:
+            self._items.append(item)
+            self._save()
+        return item
+
+    def items(self) -> list:
+        with self._lock:
+            return [dict(it) for it in self._items]
+
+    def update(self, item: dict) -> None:
+        with self._lock:
+            for i, it in enumerate(self._items):
+                if it["id"] == item["id"]:
+                    self._items[i] = dict(item)
+                    self._save()
+                    return
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            self._items = [it for it in self._items if it["id"] != item_id]
+            self._save()
+
+
+# ── 재연결 시 자동 발송 ────────────────────────────────────────────────────────
+
+class QueueDrainer:
+    """연결이 확인되면 대기열을 비우는 백그라운드 작업자.
+
+    deliver(item)       — 항목 하나를 처리 (실패 시 예외). item["response"]를
+                          채워두면 재시도 때 Gemini 호출을 건너뛸 수 있습니다.
+    is_retryable(exc)   — 네트워크성 오류면 True: 항목을 남기고 백오프 후 재시도
+    on_event(kind, item, exc)
+                        — "sent" | "dropped" 알림 (작업자 스레드에서 호출)
+    """
+
+    def __init__(
+        self,
+        queue: PendingQueue,
+        deliver,
+        is_retryable,
+        on_event=None,
+        probe=probe_online,
+        max_workers: int = 2,
+        max_attempts: int = 5,
+        poll_interval: float = 15.0,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+    ):
+        self._queue         = queue
+        self._deliver       = deliver
+        self._is_retryable  = is_retryable
+        self._on_event      = on_event or (lambda *a: None)
+        self._probe         = probe
+        self._max_workers   = max_workers
+        self._max_attempts  = max_attempts
+        self._poll_interval = poll_interval
+        self._backoff_base  = backoff_base
+        self._backoff_max   = backoff_max
+        self._wake          = threading.Event()
+        self._stopped       = threading.Event()
+        self._paused        = threading.Event()
+        self._thread        = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def pause(self) -> None:
+        """새 발송을 멈춥니다 (진행 중인 항목은 끝까지). resume()까지 유지."""
+        self._paused.set()
+
+    def resume(self) -> None:
+        self._paused.clear()
+        self._wake.set()
+
+    def kick(self) -> None:
+        """새 항목이 들어왔을 때 대기 없이 바로 확인하도록 깨웁니다."""
+        self._wake.set()
+
+    def _sleep(self, seconds: float) -> None:
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _backoff(self, failures: int) -> float:
+        delay = min(self._backoff_base * (2 ** failures), self._backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _loop(self) -> None:
+        failures = 0
+        while not self._stopped.is_set():
+            if self._paused.is_set() or not len(self._queue) or not self._probe():
+                self._sleep(self._poll_interval)
+                continue
+            if self._drain():
+                failures = 0
+            else:
+                self._sleep(self._backoff(failures))
+                failures += 1
+
+    def _drain(self) -> bool:
+        """대기열을 한 번 훑습니다. 실패가 있었으면 False (남은 항목은 백오프 후 다시)."""
+        halted = threading.Event()
+        failed = threading.Event()
+
+        def _one(item):
+            if halted.is_set() or self._stopped.is_set() or self._paused.is_set():
+                return
+            try:
+                self._deliver(item)
+            except Exception as exc:
+                failed.set()
+                if self._is_retryable(exc):
+                    halted.set()
+                    self._queue.update(item)
+                    return
+                item["attempts"] = item.get("attempts", 0) + 1
+                if item["attempts"] >= self._max_attempts:
+                    self._queue.remove(item["id"])
+                    self._on_event("dropped", item, exc)
+                else:
+                    self._queue.update(item)
+                return
+            self._queue.remove(item["id"])
+            self._on_event("sent", item, None)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            list(pool.map(_one, self._queue.items()))
+        return not failed.is_set()
@@ -0,0 +1,278 @@
+"""
+응답 후처리 파이프라인
+════════════════════════════════════════════════════════════════════════════════
+call_gemini와 메일 발송 사이에서 응답에 선택적 단계를 적용합니다.
+
+  redact    — 개인정보(이메일/전화번호/주민등록번호/카드번호) 가리기 (기본 꺼짐 —
+              응답 속 숫자 묶음도 가려지므로 config의 postprocess에 넣어야 켜짐)
+  language  — 문자 분포로 응답 언어 판별 (Content-Language 헤더)
+  keywords  — 빈도 기반 키워드 태그 (Keywords 헤더)
+  subject   — 응답 요약 → 메일 제목 (prompt[:40] 잘라내기 대신)
+
+  - 단계마다 비용(cost)과 의존 단계(requires)를 선언
+  - 의존 관계가 없는 단계는 스레드 풀에서 동시에 실행 (비싼 단계부터 제출)
+    → 단계를 늘려도 지연 시간이 직렬로 쌓이지 않음
+  - 결과는 응답 SHA-256 해시 기준으로 메모이즈 (대기열 재시도/같은 응답 재발송)
+  - requires에 적힌 단계가 꺼져 있거나 실패하면 원래 응답으로 진행
+  - close()는 진행 중인 run()이 끝난 뒤 스레드 풀을 닫음 (설정 저장 중 발송 보호)
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_STAGES = ("language", "keywords", "subject")
+
+SUBJECT_CHARS  = 60
+KEYWORD_COUNT  = 5
+CACHE_SIZE     = 64
+SAMPLE_CHARS   = 20_000      # 언어 판별/키워드는 앞부분만 봐도 충분
+
+
+class Stage:
+    """후처리 단계 하나. fn(response, results) → 값 (results: 끝난 의존 단계 값)"""
+
+    def __init__(self, name: str, fn, cost: float = 1.0, requires: tuple = ()):
+        self.name     = name
+        self.fn       = fn
+        self.cost     = cost
+        self.requires = tuple(requires)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, cost={self.cost}, requires={self.requires})"
+
+
+# ── 개인정보 가리기 ────────────────────────────────────────────────────────────
+
+_PII_PATTERNS = [
+    # 숫자 경계는 (?<!\d)/(?!\d) — 한글 조사가 바로 붙어도 ("010-...로") 잡히도록
+    ("[주민번호]",  re.compile(r"(?<!\d)\d{6}-[1-8]\d{6}(?!\d)")),
+    ("[카드번호]",  re.compile(r"(?<!\d)(?:\d{4}[- ]){3}\d{4}(?!\d)")),
+    ("[이메일]",    re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")),
+    ("[전화번호]",  re.compile(r"(?:\+82[- ]?|(?<!\d)0)\d{1,2}[- ]?\d{3,4}[- ]\d{4}(?!\d)")),
+]
+_PII_TAGS = {tag.strip("[]") for tag, _ in _PII_PATTERNS}
+
+
+def redact(text: str) -> str:
+    for tag, pattern in _PII_PATTERNS:
+        text = pattern.sub(tag, text)
+    return text
+
+
+# ── 언어 판별 ─────────────────────────────────────────────────────────────────
+
+def detect_language(text: str) -> str:
+    """BCP 47 언어 코드. 한글/가나/한자/키릴/라틴 문자 수로만 판별합니다."""
+    ko = kana = han = ru = latin = 0
+    for ch in text[:SAMPLE_CHARS]:
+        o = ord(ch)
+        if 0xAC00 <= o <= 0xD7A3 or 0x3130 <= o <= 0x318F:
+            ko += 1
+        elif 0x3040 <= o <= 0x30FF:
+            kana += 1
+        elif 0x4E00 <= o <= 0x9FFF:
+            han += 1
+        elif 0x0400 <= o <= 0x04FF:
+            ru += 1
+        elif ch.isascii() and ch.isalpha():
+            latin += 1
+    scores = {
+        "ko": ko,
+        "ja": kana + han if kana else 0,    # 일본어는 한자와 가나가 섞여 있음
+        "zh": 0 if kana else han,
+        "ru": ru,
+        "en": latin / 3,    # 코드/영문 용어가 섞여도 한 글자 정보량이 적어 가중치를 낮춤
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "und"
+
+
+# ── 키워드 태그 ───────────────────────────────────────────────────────────────
+
+_WORD_RE = re.compile(r"[가-힣]{2,}|[A-Za-z][A-Za-z0-9+#-]{2,}")
+_JOSA    = ("으로", "에서", "에게", "까지", "부터", "은", "는", "이", "가", "을", "를",
+            "에", "의", "로", "와", "과", "도", "만")
+_STOPWORDS = {
+    "ko": {
+        "그리고", "하지만", "그러나", "또한", "따라서", "있습니다", "합니다", "입니다",
+        "있는", "하는", "위해", "대한", "경우", "사용", "때문", "이런", "그런", "있다",
+        "한다", "것이", "수도", "같은", "다음", "예를", "들어", "가장", "통해",
+    },
+    "en": {
+        "the", "and", "for", "are", "with", "that", "this", "from", "you", "your",
+        "can", "will", "not", "but", "have", "has", "was", "were", "which", "when",
+        "into", "also", "more", "use", "using", "used", "such", "these", "than",
+    },
+}
+
+
+def _stem(word: str) -> str:
+    """한국어 조사 하나를 떼어냅니다 (두 글자 이상 남을 때만)."""
+    for josa in _JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= 2:
+            return word[:-len(josa)]
+    return word
+
+
+def extract_keywords(text: str, language: str = None, count: int = KEYWORD_COUNT) -> list:
+    stop = _STOPWORDS.get(language) or _STOPWORDS["ko"] | _STOPWORDS["en"]
+    words = Counter()
+    for m in _WORD_RE.finditer(text[:SAMPLE_CHARS]):
+        word = _stem(m.group())
+        key  = word.lower()
+        if key in stop or word in _PII_TAGS:
+            continue
+        words[key] += 1
+    return [w for w, n in words.most_common(count) if n > 1]
+
+
+# ── 제목 요약 ─────────────────────────────────────────────────────────────────
+
+_MARKDOWN_RE  = re.compile(r"[*_`>#]+|\[([^\]]*)\]\([^)]*\)")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s")
+
+
+def summarize_subject(text: str, limit: int = SUBJECT_CHARS) -> str:
+    """응답의 첫 제목줄, 없으면 첫 문장을 메일 제목 길이로 자릅니다."""
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    if not lines:
+        return None
+    heading = next((ln for ln in lines[:10] if ln.startswith("#")), None)
+    line    = heading or _SENTENCE_END.split(lines[0], 1)[0]
+    line    = " ".join(_MARKDOWN_RE.sub(lambda m: m.group(1) or "", line).split())
+    if not line:
+        return None
+    return line if len(line) <= limit else line[:limit - 1].rstrip() + "…"
+
+
+# ── 파이프라인 ────────────────────────────────────────────────────────────────
+
+def default_stages(summarize=None) -> list:
+    """summarize(text) → 제목: 주어지면 subject 단계가 이를 사용합니다
+    (예: Gemini 한 줄 요약 — 네트워크 호출이므로 비용을 높게 선언)."""
+
+    def _subject(response, results):
+        text = results.get("redact", response)
+        if summarize is not None:
+            try:
+                title = summarize(text)
+                if title and title.strip():
+                    return summarize_subject(title)
+            except Exception:
+                pass     # 요약 호출 실패 → 추출식 제목
+        return summarize_subject(text)
+
+    return [
+        Stage("redact",   lambda r, _: redact(r), cost=1),
+        Stage("language", lambda r, _: detect_language(r), cost=1),
+        Stage(
+            "keywords",
+            lambda r, res: extract_keywords(res.get("redact", r), res.get("language")),
+            cost=2, requires=("redact", "language"),
+        ),
+        Stage("subject", _subject, cost=50 if summarize else 1, requires=("redact",)),
+    ]
+
+
+class Pipeline:
+    """단계 의존 관계대로 실행하고 응답 해시별로 결과를 보관합니다."""
+
+    def __init__(self, stages: list, max_workers: int = 4, cache_size: int = CACHE_SIZE):
+        self.stages      = {s.name: s for s in stages}
+        self._pool       = ThreadPoolExecutor(max_workers=max_workers)
+        self._cache      = OrderedDict()     # (해시, 켜진 단계) → {단계 이름: 값}
+        self._cache_size = cache_size
+        self._lock       = threading.Lock()
+        self._active     = 0                 # 진행 중인 run() 수
+        self._closing    = False
+
+    @staticmethod
+    def response_key(response: str) -> str:
+        return hashlib.sha256(response.encode("utf-8")).hexdigest()
+
+    def _cached(self, key: tuple) -> dict:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return {}
+            self._cache.move_to_end(key)
+            return dict(entry)
+
+    def _remember(self, key: tuple, results: dict) -> None:
+        with self._lock:
+            self._cache.setdefault(key, {}).update(results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def prime(self, response: str, results: dict, enabled=DEFAULT_STAGES) -> None:
+        """이미 알고 있는 단계 결과(예: 보관함 레코드)를 캐시에 넣습니다.
+
+        빠진 단계는 다음 run()에서만 계산됩니다.
+        """
+        enabled = [n for n in enabled if n in self.stages]
+        key     = (self.response_key(response), tuple(sorted(enabled)))
+        self._remember(key, {n: v for n, v in results.items() if n in enabled})
+
+    def run(self, response: str, enabled=DEFAULT_STAGES) -> dict:
+        """켜진 단계를 실행해 {단계 이름: 값}을 반환합니다 (실패한 단계는 빠짐)."""
+        with self._lock:
+            self._active += 1
+        try:
+            return self._run(response, enabled)
+        finally:
+            with self._lock:
+                self._active -= 1
+                last = self._closing and self._active == 0
+            if last:
+                self._pool.shutdown(wait=False)
+
+    def _run(self, response: str, enabled) -> dict:
+        enabled = [n for n in enabled if n in self.stages]
+        # 켜진 단계 조합도 키에 포함 — redact가 꺼졌을 때의 keywords를 재사용하지 않도록
+        key     = (self.response_key(response), tuple(sorted(enabled)))
+        results = self._cached(key)
+        todo    = [n for n in enabled if n not in results]
+        failed  = set()
+        running = {}
+
+        def _waiting_on(name):
+            return [
+                d for d in self.stages[name].requires
+                if d in enabled and d not in results and d not in failed
+            ]
+
+        while todo or running:
+            ready = [n for n in todo if not _waiting_on(n)]
+            for name in sorted(ready, key=lambda n: -self.stages[n].cost):
+                todo.remove(name)
+                stage = self.stages[name]
+                deps  = {d: results[d] for d in stage.requires if d in results}
+                try:
+                    running[self._pool.submit(stage.fn, response, deps)] = name
+                except RuntimeError:
+                    failed.add(name)    # close() 뒤에 시작된 run() — 원래 응답으로 진행
+            if not running:
+                break       # 남은 단계는 순환 의존 → 실행 불가
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    results[name] = fut.result()
+                except Exception:
+                    failed.add(name)
+
+        self._remember(key, {n: v for n, v in results.items() if n not in failed})
+        return results
+
+    def close(self) -> None:
+        """스레드 풀을 닫습니다. 진행 중인 run()이 있으면 마지막 run()이 끝날 때."""
+        with self._lock:
+            self._closing = True
+            idle = self._active == 0
+        if idle:
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,254 @@
+"""
+Gmail 발신 계정 풀
+════════════════════════════════════════════════════════════════════════════════
+여러 Gmail 계정으로 발송을 나눠 계정별 일일/분당 발송 한도를 넘지 않게 합니다.
+
+  - 가중 라운드 로빈 (smooth weighted round-robin)으로 계정 선택
+  - 계정별 발송 시각 기록 → 24시간/1분 한도 초과 계정은 건너뜀
+  - 스로틀 응답(421, 454, 550 5.4.5)을 받으면 해당 계정을 자동으로 쉬게 하고
+    다음 계정으로 재시도
+  - 계정마다 SMTP 연결을 하나씩 유지해 재사용 (STARTTLS/로그인 반복 없음)
+
+config.json:
+  "gmail_senders": [
+    {"sender": "a@gmail.com", "password": "xxxx xxxx xxxx xxxx", "weight": 2},
+    {"sender": "b@gmail.com", "password": "yyyy yyyy yyyy yyyy", "daily_limit": 100}
+  ]
+  (없으면 gmail_sender / gmail_password 한 계정으로 동작)
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import smtplib
+import threading
+import time
+from collections import deque
+
+from cancel import abort_socket
+from mailer import smtp_connect
+
+# Gmail 기본 한도 (개인 계정 기준, 계정별로 config에서 변경 가능)
+DAILY_LIMIT      = 500
+PER_MINUTE_LIMIT = 20
+
+# 스로틀 응답을 받은 계정의 휴식 시간 (초)
+COOLDOWN_TEMPORARY = 15 * 60          # 421 / 454 — 일시적 제한
+COOLDOWN_QUOTA     = 24 * 60 * 60     # 550 5.4.5 — 일일 발송 한도 초과
+
+THROTTLE_CODES = (421, 454)
+
+
+class SenderPoolExhausted(Exception):
+    """모든 발신 계정이 한도 초과 또는 휴식 중일 때."""
+
+
+def throttle_cooldown(exc: Exception):
+    """스로틀 응답이면 휴식 시간(초), 아니면 None."""
+    replies = []
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        replies = list(exc.recipients.values())
+    elif isinstance(exc, smtplib.SMTPResponseException):
+        replies = [(exc.smtp_code, exc.smtp_error)]
+
+    for code, text in replies:
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", "replace")
+        if code == 550 and "5.4.5" in text:
+            return COOLDOWN_QUOTA
+        if code in THROTTLE_CODES:
+            return COOLDOWN_TEMPORARY
+    return None
+
+
+def account_entries(cfg: dict) -> list:
+    """config의 발신 계정 목록 (gmail_senders 또는 단일 계정)."""
+    return cfg.get("gmail_senders") or [
+        {"sender": cfg["gmail_sender"], "password": cfg["gmail_password"]}
+    ]
+
+
+# ── 계정 ──────────────────────────────────────────────────────────────────────
+
+class SenderAccount:
+    """발신 계정 하나 + 그 계정의 SMTP 연결과 발송 기록."""
+
+    def __init__(self, sender, password, weight=1, daily_limit=DAILY_LIMIT,
+                 per_minute_limit=PER_MINUTE_LIMIT):
+        self.sender           = sender
+        self.password         = password
+        self.weight           = max(1, int(weight))
+        self.daily_limit      = daily_limit
+        self.per_minute_limit = per_minute_limit
+        self.cooldown_until   = 0.0
+        self.current_weight   = 0          # 라운드 로빈 상태
+
+        self._sent      = deque()          # 최근 24시간 발송 시각
+        self._sent_lock = threading.Lock() # _sent 전용 (선택 중 발송 완료 기록과 겹침)
+        self._conn      = None
+        self._lock      = threading.Lock() # SMTP 연결은 스레드 안전하지 않음
+
+    def _prune(self, now: float) -> None:
+        while self._sent and now - self._sent[0] > 24 * 60 * 60:
+            self._sent.popleft()
+
+    def available_at(self, now: float) -> float:
+        """발송 가능해지는 시각 (지금 가능하면 now 이하)."""
+        with self._sent_lock:
+            self._prune(now)
+            ready = self.cooldown_until
+            if len(self._sent) >= self.daily_limit:
+                ready = max(ready, self._sent[-self.daily_limit] + 24 * 60 * 60)
+            recent = [t for t in self._sent if now - t < 60]
+        if len(recent) >= self.per_minute_limit:
+            ready = max(ready, recent[-self.per_minute_limit] + 60)
+        return ready
+
+    def cool_down(self, seconds: float) -> None:
+        self.cooldown_until = time.time() + seconds
+        self.close()
+
+    def state(self) -> dict:
+        with self._sent_lock:
+            self._prune(time.time())
+            return {"sent": list(self._sent), "cooldown_until": self.cooldown_until}
+
+    def restore(self, state: dict) -> None:
+        with self._sent_lock:
+            self._sent = deque(sorted(state.get("sent", [])))
+            self.cooldown_until = state.get("cooldown_until", 0.0)
+
+    def send(self, receiver: str, message: str, job=None) -> tuple:
+        """(SMTP 응답 코드, 응답 문구) — 서버가 메일을 받았다는 DATA 응답.
+
+        job(cancel.Job)이 cancel()되면 진행 중인 명령을 끊고 JobCancelled.
+        """
+        with self._lock:
+            if job is not None:
+                job.check()     # 앞선 발송을 기다리는 동안 취소됐을 수 있음
+            for attempt in range(2):
+                if self._conn is None:
+                    self._conn = smtp_connect(self.sender, self.password, job)
+                try:
+                    self._sendmail(receiver, message, job)
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    # 오래 쉬어 서버가 끊은 연결 → 한 번만 다시 연결
+                    self._conn = None
+                    if attempt:
+                        raise
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                    raise       # 서버 응답 오류 — 연결은 정상
+                except OSError:
+                    self._drop()
+                    raise
+            with self._sent_lock:
+                self._sent.append(time.time())
+            return self._conn.last_reply
+
+    def _sendmail(self, receiver: str, message: str, job) -> None:
+        conn = self._conn
+        if job is None:
+            conn.sendmail(self.sender, receiver, message)
+            return
+        try:
+            with job.abort_with(lambda: abort_socket(conn.sock)):
+                conn.sendmail(self.sender, receiver, message)
+        except Exception as exc:
+            if job.cancelled:
+                # 끊긴 연결은 QUIT 없이 버림 — 다음 발송은 새로 연결
+                conn.close()
+                self._conn = None
+                job.check(exc)
+            raise
+
+    def _drop(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except Exception:
+                self._conn.close()
+            self._conn = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop()
+
+
+# ── 풀 ────────────────────────────────────────────────────────────────────────
+
+class SenderPool:
+
+    def __init__(self, accounts: list):
+        if not accounts:
+            raise ValueError("발신 계정이 없습니다")
+        self.accounts = accounts
+        self._lock    = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "SenderPool":
+        entries = account_entries(cfg)
+        return cls([
+            SenderAccount(
+                e["sender"], e["password"],
+                weight=e.get("weight", 1),
+                daily_limit=e.get("daily_limit", DAILY_LIMIT),
+                per_minute_limit=e.get("per_minute_limit", PER_MINUTE_LIMIT),
+            )
+            for e in entries
+        ])
+
+    def _select(self, exclude: set):
+        """smooth weighted round-robin — 가중치 비율대로 고르게 섞어 선택."""
+        now = time.time()
+        with self._lock:
+            ready = [
+                a for a in self.accounts
+                if a not in exclude and a.available_at(now) <= now
+            ]
+            if not ready:
+                return None
+            total = sum(a.weight for a in ready)
+            for a in ready:
+                a.current_weight += a.weight
+            best = max(ready, key=lambda a: a.current_weight)
+            best.current_weight -= total
+            return best
+
+    def send(self, receiver: str, build_message, job=None) -> tuple:
+        """build_message(sender) → MIME 메시지. job: cancel.Job (취소/제한 시간).
+
+        (발송에 쓴 계정 주소, 보낸 메시지, (SMTP 응답 코드, 응답 문구))를 반환합니다.
+        """
+        tried = set()
+        while True:
+            account = self._select(tried)
+            if account is None:
+                now  = time.time()
+                wait = min(a.available_at(now) for a in self.accounts) - now
+                raise SenderPoolExhausted(
+                    f"모든 발신 계정이 발송 한도/대기 중 — 약 {max(wait, 0) / 60:.0f}분 후 가능"
+                )
+            msg = build_message(account.sender)
+            try:
+                reply = account.send(receiver, msg.as_string(), job)
+                return account.sender, msg, reply
+            except smtplib.SMTPException as exc:
+                cooldown = throttle_cooldown(exc)
+                if cooldown is None:
+                    raise
+                account.cool_down(cooldown)
+                tried.add(account)
+
+    def state(self) -> dict:
+        """계정 주소별 발송 기록/휴식 시각 — 풀을 다시 만들거나 앱을 재시작해도
+        한도와 휴식이 이어지도록 저장해 둡니다."""
+        return {a.sender: a.state() for a in self.accounts}
+
+    def restore(self, state: dict) -> None:
+        for account in self.accounts:
+            if account.sender in state:
+                account.restore(state[account.sender])
+
+    def close(self) -> None:
+        """로그인된 SMTP 연결만 닫습니다 (발송 기록/휴식 상태는 유지)."""
+        for account in self.accounts:
+            account.close()
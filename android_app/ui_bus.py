@@ -0,0 +1,69 @@
+"""
+UI 업데이트 버스
+════════════════════════════════════════════════════════════════════════════════
+작업자 스레드(Gemini 호출, 메일 발송, 대기열, 비교 모드)가 보내는 UI 변경을
+모았다가 프레임당 한 번만 적용합니다.
+
+  - post(key, fn, *args) — 같은 key는 마지막 값만 남김 (상태 문구, 응답 본문,
+    버튼 상태 등은 중간 값을 그릴 필요가 없음)
+  - Clock 트리거 하나로 다음 프레임에 한꺼번에 적용 → 작업이 많아도 메인 루프에
+    쌓이는 콜백은 프레임당 1개
+  - key는 처음 post된 순서대로 적용 (예: 상태 문구 → 버튼 활성화)
+  - intervals={key: 초} — 그리기 비싼 key(긴 응답 Label은 텍스처를 통째로 다시
+    렌더링)는 최소 간격을 두고 적용. 마지막 값은 간격이 지나면 반드시 적용됨
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+import time
+
+from kivy.clock import Clock
+
+
+class UiBus:
+
+    def __init__(self, intervals: dict = None):
+        self._pending   = {}                # key → (fn, args, kwargs)
+        self._intervals = dict(intervals or {})
+        self._last      = {}                # key → 마지막 적용 시각
+        self._delayed   = False             # 간격 대기 중인 재확인 예약 여부
+        self._lock      = threading.Lock()
+        self._trigger   = Clock.create_trigger(self._flush, 0)
+
+    def post(self, key, fn, *args, **kwargs) -> None:
+        """어느 스레드에서나 호출 가능. 다음 프레임에 fn(*args, **kwargs) 실행."""
+        with self._lock:
+            self._pending[key] = (fn, args, kwargs)
+        self._trigger()
+
+    def _flush(self, dt) -> None:
+        now   = time.monotonic()
+        ready = {}
+        wait  = None
+        with self._lock:
+            for key, item in self._pending.items():
+                gap = self._intervals.get(key, 0) - (now - self._last.get(key, float("-inf")))
+                if gap > 0:
+                    wait = gap if wait is None else min(wait, gap)
+                else:
+                    ready[key] = item
+            for key in ready:
+                del self._pending[key]
+            if wait is not None and not self._delayed:
+                self._delayed = True
+                Clock.schedule_once(self._flush_delayed, wait)
+
+        for key, (fn, args, kwargs) in ready.items():
+            fn(*args, **kwargs)
+            self._last[key] = now
+
+    def _flush_delayed(self, dt) -> None:
+        with self._lock:
+            self._delayed = False
+        self._flush(dt)
+
+    @property
+    def idle(self) -> bool:
+        with self._lock:
+            return not self._pending
+
@@ -0,0 +1,333 @@
+"""
+자격 증명 보관소 (vault.json)
+════════════════════════════════════════════════════════════════════════════════
+gemini_api_key, gmail_password, gmail_senders[*].password를 config.json 평문
+대신 암호화된 vault.json에 저장합니다.
+
+  암호화 — AES-256-GCM (직접 만든 암호 없음)
+    - Android: AndroidKeyStore의 AES-GCM 키로 비밀 값을 직접 암호화
+      (키는 기기 밖으로 꺼낼 수 없고 Python 메모리에도 올라오지 않음,
+      사용자 입력 불필요)
+    - 데스크톱: 환경 변수 GEMINI_VAULT_PASSPHRASE → PBKDF2-SHA256 키 →
+      cryptography 패키지의 AESGCM (pip install cryptography)
+    - 둘 다 없으면 None → 이전처럼 config.json 평문 사용
+
+  세션 캐시
+    키 준비(PBKDF2/키스토어 조회)와 복호화는 세션당 한 번. 설정 저장(store)도
+    캐시된 키를 그대로 쓰고 캐시를 새 값으로 바꿈 — 다음 요청에 지연 없음.
+    평문은 bytearray에 담아 가능하면 mlock으로 스왑 금지, 앱이 일시정지되면
+    wipe()로 0으로 덮어쓰고 키도 버립니다.
+    (requests/smtplib에 넘기는 str 사본, cryptography 내부의 키 사본까지 지울
+    수는 없으므로 최선의 노력)
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import base64
+import ctypes
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+
+PASSPHRASE_ENV    = "GEMINI_VAULT_PASSPHRASE"
+KEYSTORE_ALIAS    = "gemini_client_vault"
+PBKDF2_ITERATIONS = 200_000
+VAULT_VERSION     = 2
+GCM_NONCE_BYTES   = 12
+GCM_TAG_BITS      = 128
+
+SECRET_KEYS = ("gemini_api_key", "gmail_password")
+
+
+# ── 설정 ↔ 비밀 값 분리 ────────────────────────────────────────────────────────
+
+def split_secrets(cfg: dict) -> tuple:
+    """(config.json에 남길 값, vault에 넣을 값)"""
+    public  = {k: v for k, v in cfg.items() if k not in SECRET_KEYS}
+    secrets = {k: cfg[k] for k in SECRET_KEYS if cfg.get(k)}
+    if cfg.get("gmail_senders"):
+        public["gmail_senders"] = [
+            {k: v for k, v in e.items() if k != "password"} for e in cfg["gmail_senders"]
+        ]
+        secrets["sender_passwords"] = {
+            e["sender"]: e["password"] for e in cfg["gmail_senders"] if e.get("password")
+        }
+    return public, secrets
+
+
+def merge_secrets(public: dict, secrets: dict) -> dict:
+    cfg = dict(public)
+    cfg.update({k: v for k, v in secrets.items() if k in SECRET_KEYS})
+    passwords = secrets.get("sender_passwords", {})
+    if cfg.get("gmail_senders"):
+        cfg["gmail_senders"] = [
+            dict(e, password=passwords.get(e["sender"], e.get("password", "")))
+            for e in cfg["gmail_senders"]
+        ]
+    return cfg
+
+
+# ── 암호화 ────────────────────────────────────────────────────────────────────
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text.encode("ascii"))
+
+
+def _open_failed() -> ValueError:
+    return ValueError("자격 증명 복호화 실패 — 키 또는 패스프레이즈를 확인하세요")
+
+
+# ── 키 출처 ───────────────────────────────────────────────────────────────────
+# unlock(meta) → encrypt(plaintext) -> {"nonce", "ciphertext"} /
+#                decrypt(box) -> bytearray 를 가진 세션용 키 객체
+
+class _AesGcmKey:
+    """cryptography AESGCM (태그는 ciphertext 끝에 붙음)."""
+
+    def __init__(self, key: bytes):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        self._aead = AESGCM(key)
+
+    def encrypt(self, plaintext) -> dict:
+        nonce = os.urandom(GCM_NONCE_BYTES)
+        return {
+            "nonce":      _b64(nonce),
+            "ciphertext": _b64(self._aead.encrypt(nonce, bytes(plaintext), None)),
+        }
+
+    def decrypt(self, box: dict) -> bytearray:
+        from cryptography.exceptions import InvalidTag
+        try:
+            return bytearray(self._aead.decrypt(_unb64(box["nonce"]), _unb64(box["ciphertext"]), None))
+        except InvalidTag:
+            raise _open_failed() from None
+
+
+class PassphraseKey:
+    """패스프레이즈 + salt → PBKDF2-SHA256 → AES-256-GCM 키."""
+
+    name = "passphrase"
+
+    def __init__(self, passphrase: str):
+        self._passphrase = passphrase
+
+    def unlock(self, meta: dict) -> _AesGcmKey:
+        if "salt" not in meta:
+            meta["salt"]       = _b64(os.urandom(16))
+            meta["iterations"] = PBKDF2_ITERATIONS
+        return _AesGcmKey(hashlib.pbkdf2_hmac(
+            "sha256", self._passphrase.encode("utf-8"),
+            _unb64(meta["salt"]), meta["iterations"],
+        ))
+
+
+class _KeystoreKey:
+    """AndroidKeyStore 키 핸들 — 암호화/복호화는 키스토어 안에서."""
+
+    def __init__(self, key):
+        from jnius import autoclass
+        self._key     = key
+        self._Cipher  = autoclass("javax.crypto.Cipher")
+        self._GCMSpec = autoclass("javax.crypto.spec.GCMParameterSpec")
+
+    @staticmethod
+    def _jbytes(arr) -> bytearray:
+        return bytearray((b + 256) % 256 for b in arr)
+
+    def encrypt(self, plaintext) -> dict:
+        # 키스토어 키는 IV를 직접 만들도록 되어 있음 (호출자 IV 금지)
+        cipher = self._Cipher.getInstance("AES/GCM/NoPadding")
+        cipher.init(self._Cipher.ENCRYPT_MODE, self._key)
+        ciphertext = cipher.doFinal(bytes(plaintext))
+        return {
+            "nonce":      _b64(bytes(self._jbytes(cipher.getIV()))),
+            "ciphertext": _b64(bytes(self._jbytes(ciphertext))),
+        }
+
+    def decrypt(self, box: dict) -> bytearray:
+        from jnius import JavaException
+        cipher = self._Cipher.getInstance("AES/GCM/NoPadding")
+        try:
+            cipher.init(self._Cipher.DECRYPT_MODE, self._key,
+                        self._GCMSpec(GCM_TAG_BITS, _unb64(box["nonce"])))
+            return self._jbytes(cipher.doFinal(_unb64(box["ciphertext"])))
+        except JavaException:          # AEADBadTagException 등
+            raise _open_failed() from None
+
+
+class AndroidKeystoreKey:
+    """AndroidKeyStore의 AES-GCM 키 (없으면 만듦)."""
+
+    name = "keystore"
+
+    def unlock(self, meta: dict) -> _KeystoreKey:
+        from jnius import autoclass
+
+        KeyStore      = autoclass("java.security.KeyStore")
+        KeyGenerator  = autoclass("javax.crypto.KeyGenerator")
+        KeyProperties = autoclass("android.security.keystore.KeyProperties")
+        SpecBuilder   = autoclass("android.security.keystore.KeyGenParameterSpec$Builder")
+
+        store = KeyStore.getInstance("AndroidKeyStore")
+        store.load(None)
+        if not store.containsAlias(KEYSTORE_ALIAS):
+            gen = KeyGenerator.getInstance(KeyProperties.KEY_ALGORITHM_AES, "AndroidKeyStore")
+            gen.init(
+                SpecBuilder(
+                    KEYSTORE_ALIAS,
+                    KeyProperties.PURPOSE_ENCRYPT | KeyProperties.PURPOSE_DECRYPT,
+                )
+                .setBlockModes([KeyProperties.BLOCK_MODE_GCM])
+                .setEncryptionPaddings([KeyProperties.ENCRYPTION_PADDING_NONE])
+                .setKeySize(256)
+                .build()
+            )
+            gen.generateKey()
+        return _KeystoreKey(store.getKey(KEYSTORE_ALIAS, None))
+
+
+def default_key_source():
+    """이 환경에서 쓸 수 있는 키 출처 (없으면 None → 평문 config.json)."""
+    # pyjnius는 p4a Kivy 빌드에 포함됨 / AES 키스토어는 API 23+
+    if "ANDROID_ARGUMENT" in os.environ and importlib.util.find_spec("jnius"):
+        return AndroidKeystoreKey()
+    passphrase = os.environ.get(PASSPHRASE_ENV)
+    if passphrase:
+        return PassphraseKey(passphrase)
+    return None
+
+
+# ── 메모리 잠금 캐시 ───────────────────────────────────────────────────────────
+
+def _libc():
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        for fn in (libc.mlock, libc.munlock):
+            fn.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+            fn.restype  = ctypes.c_int
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class _LockedBuffer:
+    """bytearray + (가능하면) mlock. wipe()로 0으로 덮어씀."""
+
+    _libc = _libc()
+
+    def __init__(self, data: bytes):
+        self._buf    = bytearray(data)
+        self._addr   = None
+        self._locked = False
+        if self._buf:
+            # from_buffer 사본이 살아 있는 동안 bytearray 크기/위치가 고정됨
+            self._view = (ctypes.c_char * len(self._buf)).from_buffer(self._buf)
+            self._addr = ctypes.addressof(self._view)
+            if self._libc is not None:
+                self._locked = self._libc.mlock(self._addr, len(self._buf)) == 0
+
+    def value(self) -> str:
+        return self._buf.decode("utf-8")
+
+    def wipe(self) -> None:
+        if self._addr is not None:
+            ctypes.memset(self._addr, 0, len(self._buf))
+            if self._locked:
+                self._libc.munlock(self._addr, len(self._buf))
+        self._locked = False
+
+
+# ── 보관소 ────────────────────────────────────────────────────────────────────
+
+class CredentialVault:
+    """vault.json 읽기/쓰기 + 세션 동안 키와 복호화된 값 캐시."""
+
+    def __init__(self, path: str, key_source):
+        self._path   = path
+        self._source = key_source
+        self._lock   = threading.Lock()
+        self._key    = None      # 키 출처의 unlock() 결과 (세션 동안 유지)
+        self._cache  = None      # {이름: _LockedBuffer} / sender_passwords는 {주소: _LockedBuffer}
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path)
+
+    def _read(self) -> dict:
+        with open(self._path, "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != VAULT_VERSION:
+            raise ValueError(f"지원하지 않는 vault 형식: {meta.get('version')!r}")
+        return meta
+
+    def _unlock(self, meta: dict):
+        if self._key is None:
+            self._key = self._source.unlock(meta)
+        return self._key
+
+    @staticmethod
+    def _to_cache(data: dict) -> dict:
+        return {
+            k: {a: _LockedBuffer(p.encode("utf-8")) for a, p in v.items()}
+            if isinstance(v, dict) else _LockedBuffer(v.encode("utf-8"))
+            for k, v in data.items()
+        }
+
+    def _load(self) -> dict:
+        """세션 첫 접근 때 한 번만 복호화합니다 (lock 안에서 호출)."""
+        if self._cache is None:
+            data = {}
+            if self.exists():
+                meta  = self._read()
+                plain = self._unlock(meta).decrypt(meta)
+                data  = json.loads(plain.decode("utf-8"))
+                plain[:] = bytes(len(plain))
+            self._cache = self._to_cache(data)
+        return self._cache
+
+    def get(self, name: str, default: str = "") -> str:
+        with self._lock:
+            buf = self._load().get(name)
+        return buf.value() if isinstance(buf, _LockedBuffer) else default
+
+    def secrets(self) -> dict:
+        with self._lock:
+            cache = self._load()
+            return {
+                k: {a: b.value() for a, b in v.items()} if isinstance(v, dict) else v.value()
+                for k, v in cache.items()
+            }
+
+    def store(self, secrets: dict) -> None:
+        """암호화해 저장하고 캐시를 새 값으로 바꿉니다 (키는 세션 동안 유지)."""
+        with self._lock:
+            meta = {"version": VAULT_VERSION, "source": self._source.name}
+            old  = self._read() if self.exists() else {}
+            if old.get("source") == self._source.name:
+                meta.update({k: old[k] for k in ("salt", "iterations") if k in old})
+            else:
+                self._key = None             # 새 salt로 키를 다시 만듦
+            meta.update(self._unlock(meta).encrypt(json.dumps(secrets).encode("utf-8")))
+
+            tmp = self._path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._path)
+            self._wipe_cache()
+            self._cache = self._to_cache(secrets)
+
+    def _wipe_cache(self) -> None:
+        for v in (self._cache or {}).values():
+            for buf in (v.values() if isinstance(v, dict) else [v]):
+                buf.wipe()
+        self._cache = None
+
+    def wipe(self) -> None:
+        """앱 일시정지 시 호출 — 평문을 지우고 키를 버림. 다음 접근 때 다시 복호화합니다."""
+        with self._lock:
+            self._wipe_cache()
+            self._key = None
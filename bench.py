@@ -0,0 +1,429 @@
+"""
+Gemini Client — 성능 측정 스크립트
+════════════════════════════════════════════════════════════════════════════════
+android_app/ 모듈을 실제 네트워크 없이 합성 데이터로 측정합니다.
+
+사용법:
+  python bench.py stream     # 응답 JSON 파싱: resp.json() vs 스트리밍 추출
+  python bench.py attach     # 메일 크기: 본문 포함 vs 압축 첨부
+  python bench.py ttff       # 데스크톱 Kivy 첫 프레임까지 시간 (kivy 필요)
+  python bench.py vault      # 자격 증명: 최초 복호화 비용 vs 요청당 조회 비용
+  python bench.py post       # 응답 후처리: 단계 직렬 합계 vs 파이프라인 (캐시 포함)
+  python bench.py ui         # 동시 작업 20개의 UI 갱신: 변경마다 예약 vs 프레임당 1회 (kivy 필요)
+  python bench.py deliveries # 발송 기록: 기록 수별 색인 로드 시간 / 작업 ID 조회 시간
+  python bench.py archive    # 보관함: 추가 / ID 조회 / 기간 내보내기 vs gzip 전체 훑기
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "android_app"))
+
+
+def _measure(fn):
+    """(결과, 소요 시간 ms, 최대 메모리 MB) — 시간은 tracemalloc 없이 따로 잰다."""
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - t0) * 1000
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+# ── 응답 JSON 파싱 ─────────────────────────────────────────────────────────────
+
+def _synthetic_response(text_mb: float, candidates: int) -> bytes:
+    part = "가나다라 Gemini 응답 본문입니다. \"인용\"\n" * 64
+    n_parts = max(1, int(text_mb * 1024 * 1024 / len(part.encode()) / candidates))
+    safety = [
+        {"category": f"HARM_CATEGORY_{i}", "probability": "NEGLIGIBLE", "blocked": False}
+        for i in range(200)
+    ]
+    data = {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": part} for _ in range(n_parts)]},
+                "finishReason": "STOP",
+                "safetyRatings": safety,
+                "index": i,
+            }
+            for i in range(candidates)
+        ],
+        "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 123456},
+    }
+    return json.dumps(data).encode()
+
+
+def bench_stream():
+    from gemini_stream import extract_response
+
+    chunk = 64 * 1024
+    print(f"{'본문':>8} {'후보':>4} | {'json() ms':>10} {'MB':>7} | {'stream ms':>10} {'MB':>7}")
+    for text_mb, candidates in [(2, 1), (8, 1), (8, 4), (32, 4)]:
+        body = _synthetic_response(text_mb, candidates)
+        size = len(body) / 1024 / 1024
+
+        def _chunks():
+            for i in range(0, len(body), chunk):
+                yield body[i:i + chunk]
+
+        def _full():
+            # requests의 resp.json(): 본문 전체를 모은 뒤 dict 트리 생성
+            data = json.loads(b"".join(_chunks()))
+            parts = data["candidates"][0]["content"]["parts"]
+            return "".join(p.get("text", "") for p in parts).strip()
+
+        def _stream():
+            return extract_response(_chunks()).text
+
+        full, t_full, m_full = _measure(_full)
+        stream, t_stream, m_stream = _measure(_stream)
+        assert full == stream
+        print(f"{size:7.1f}M {candidates:>4} | {t_full:10.1f} {m_full:7.1f} | {t_stream:10.1f} {m_stream:7.1f}")
+
+
+# ── 메일 첨부 모드 ─────────────────────────────────────────────────────────────
+
+def bench_attach():
+    from mailer import ATTACH_FORMATS, build_message
+
+    prompt = "대규모 분산 시스템의 장애 대응 절차를 단계별로 자세히 설명해줘"
+    # 반복이 심하면 압축률이 과장되므로 단어를 무작위로 섞은 응답을 사용
+    rng   = random.Random(0)
+    words = (
+        "장애 감지 영향 범위 파악 롤백 결정 로그 수집 지표 확인 원인 분석 배포 "
+        "모니터링 알림 임계값 서비스 복구 검증 회고 문서화 monitoring rollback "
+        "latency error budget incident timeline mitigation owner 0 1 2 3 4 5 6 7 8 9"
+    ).split()
+    print(f"{'응답':>8} | {'본문 포함':>10} | " + " | ".join(f"{f:>16}" for f in ATTACH_FORMATS))
+    for kb in (16, 64, 256, 1024):
+        lines = []
+        size = 0
+        while size < kb * 1024:
+            line = " ".join(rng.choice(words) for _ in range(rng.randint(4, 16)))
+            lines.append(f"- {line}" if rng.random() < 0.3 else line)
+            size += len(line.encode()) + 1
+        response = "\n".join(lines)
+
+        inline = len(build_message("a@x", "b@x", prompt, response, attach_threshold=0).as_bytes())
+        row = []
+        for fmt in ATTACH_FORMATS:
+            t0 = time.perf_counter()
+            size = len(build_message(
+                "a@x", "b@x", prompt, response, attach_threshold=1, attach_format=fmt
+            ).as_bytes())
+            ms = (time.perf_counter() - t0) * 1000
+            row.append(f"{size / 1024:7.1f}K {100 * (1 - size / inline):3.0f}% {ms:3.0f}ms")
+        print(f"{kb:7d}K | {inline / 1024:9.1f}K | " + " | ".join(row))
+
+
+# ── 첫 프레임까지 시간 (데스크톱 Kivy, Android 콜드 스타트 대용) ─────────────
+
+_TTFF_DRIVER = r"""
+import os, sys, time
+sys.path.insert(0, sys.argv[2])
+eager = sys.argv[3] == "eager"
+if eager:
+    # 이전 방식 재현: 네트워크 모듈을 먼저 import하고 모든 위젯을 즉시 구성
+    import requests, ssl, email.mime.multipart, email.mime.text
+    import gemini_api, mailer, offline_queue
+import main
+from kivy.core.window import Window
+from kivy.clock import Clock
+if eager:
+    main.after_first_frame = lambda cb: cb()
+
+def _first_flip(*_):
+    print(time.time() - float(sys.argv[1]))
+    Clock.schedule_once(lambda dt: main.App.get_running_app().stop(), 0)
+Window.bind(on_flip=_first_flip)
+main.GeminiApp().run()
+"""
+
+
+def bench_ttff(runs: int = 5):
+    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "android_app")
+    env = dict(os.environ, KIVY_NO_CONSOLELOG="1", KIVY_NO_ARGS="1")
+    for mode in ("eager", "fast"):
+        samples = []
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, "-c", _TTFF_DRIVER, str(time.time()), app_dir, mode],
+                capture_output=True, text=True, env=env, check=True,
+            ).stdout.split()
+            samples.append(float(out[0]) * 1000)
+        samples.sort()
+        print(f"{mode:>6}: 중앙값 {samples[len(samples) // 2]:7.1f} ms  "
+              f"(최소 {samples[0]:.1f} / 최대 {samples[-1]:.1f})")
+
+
+# ── UI 갱신 병합 (데스크톱 Kivy) ───────────────────────────────────────────────
+
+_UI_DRIVER = r"""
+import sys, threading, time
+sys.path.insert(0, sys.argv[1])
+mode, jobs, updates = sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+import main, ui_bus
+from kivy.clock import Clock
+from kivy.core.window import Window
+
+class CountingBus(ui_bus.UiBus):
+    # 요청한 변경 수 / 실제로 적용한 변경 수
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.posted = self.applied = 0
+        self._count_lock = threading.Lock()
+
+    def post(self, key, fn, *args, **kwargs):
+        with self._count_lock:
+            self.posted += 1
+        super().post(key, self._counted(fn), *args, **kwargs)
+
+    def _counted(self, fn):
+        def _apply(*args, **kwargs):
+            self.applied += 1
+            fn(*args, **kwargs)
+        return _apply
+
+class DirectBus(CountingBus):
+    # 이전 방식: 변경마다 Clock.schedule_once
+    def post(self, key, fn, *args, **kwargs):
+        with self._count_lock:
+            self.posted += 1
+        fn = self._counted(fn)
+        Clock.schedule_once(lambda dt: fn(*args, **kwargs))
+
+    @property
+    def idle(self):
+        return self.applied >= self.posted
+
+main.UiBus = DirectBus if mode == "direct" else CountingBus
+
+frames, threads = [], []
+
+def _job(lay, i):
+    # 스트리밍처럼 응답이 조금씩 늘어나며 상태/응답/버튼을 계속 갱신
+    text = ""
+    for n in range(updates):
+        text += f"작업 {i} 조각 {n} " * 6 + "\n"
+        lay._post_status(f"작업 {i}: {n + 1}/{updates}")
+        lay._ui.post("response", lay._show_response, text)
+        lay._post_busy(True)
+        time.sleep(0.02)
+    lay._post_busy(False)
+
+def _start(dt):
+    lay = main.App.get_running_app().root
+    if not hasattr(lay, "_response_lbl"):
+        return Clock.schedule_once(_start, 0.1)
+    Window.bind(on_flip=lambda *_: frames.append(time.perf_counter()))
+    threads.extend(threading.Thread(target=_job, args=(lay, i)) for i in range(jobs))
+    for t in threads:
+        t.start()
+    Clock.schedule_interval(lambda dt: _finish(lay), 0.05)
+
+def _finish(lay):
+    bus = lay._ui
+    if any(t.is_alive() for t in threads) or not bus.idle:
+        return
+    gaps = sorted((b - a) * 1000 for a, b in zip(frames, frames[1:]))
+    print(len(gaps), gaps[len(gaps) // 2], gaps[int(len(gaps) * 0.95)], gaps[-1],
+          bus.posted, bus.applied, frames[-1] - frames[0])
+    main.App.get_running_app().stop()
+
+Clock.schedule_once(_start, 0.5)
+main.GeminiApp().run()
+"""
+
+
+def bench_ui(jobs: int = 20, updates: int = 100):
+    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "android_app")
+    env = dict(os.environ, KIVY_NO_CONSOLELOG="1", KIVY_NO_ARGS="1")
+    print(f"동시 작업 {jobs}개 × 갱신 {updates}회 (상태/응답/버튼)")
+    print(f"{'방식':>8} | {'프레임':>6} | {'중앙값 ms':>9} | {'p95 ms':>7} | {'최대 ms':>8} | {'적용/요청':>13} | {'총 s':>5}")
+    for mode in ("direct", "bus"):
+        out = subprocess.run(
+            [sys.executable, "-c", _UI_DRIVER, app_dir, mode, str(jobs), str(updates)],
+            capture_output=True, text=True, env=env, check=True,
+        ).stdout.split()
+        n, median, p95, worst, posted, applied, total = (float(x) for x in out[-7:])
+        print(f"{mode:>8} | {n:6.0f} | {median:9.1f} | {p95:7.1f} | {worst:8.1f} | "
+              f"{applied:6.0f}/{posted:<6.0f} | {total:5.1f}")
+
+
+# ── 자격 증명 보관소 ───────────────────────────────────────────────────────────
+
+def bench_vault(lookups: int = 100_000):
+    from vault import CredentialVault, PassphraseKey
+
+    cfg = {"gemini_api_key": "AIza" + "x" * 35, "gmail_password": "abcd efgh ijkl mnop"}
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = CredentialVault(os.path.join(tmp, "vault.json"), PassphraseKey("bench"))
+        vault.store(cfg)
+        vault.wipe()                 # 새 세션처럼 — 키/평문 캐시 없음
+
+        t0 = time.perf_counter()
+        assert vault.get("gemini_api_key") == cfg["gemini_api_key"]
+        unlock = (time.perf_counter() - t0) * 1000
+
+        def _per_lookup(fn):
+            t0 = time.perf_counter()
+            for _ in range(lookups):
+                fn()
+            return (time.perf_counter() - t0) / lookups * 1e6
+
+        plain  = _per_lookup(lambda: cfg["gemini_api_key"])
+        cached = _per_lookup(lambda: vault.get("gemini_api_key"))
+
+    print(f"최초 복호화 (세션당 1회, 백그라운드): {unlock:8.1f} ms")
+    print(f"요청당 조회 — config dict:            {plain:8.3f} µs")
+    print(f"요청당 조회 — vault 캐시:             {cached:8.3f} µs")
+
+
+# ── 응답 후처리 파이프라인 ─────────────────────────────────────────────────────
+
+def bench_post(summary_ms: float = 400):
+    from postprocess import Pipeline, default_stages
+
+    rng   = random.Random(1)
+    words = "장애 대응 롤백 로그 지표 원인 분석 배포 monitoring latency 연락처 test@example.com 010-1234-5678".split()
+    print(f"(요약 단계는 Gemini 호출 대신 {summary_ms:.0f}ms 대기로 가정)")
+    print(f"{'응답':>6} | {'직렬 합계 ms':>12} | {'파이프라인 ms':>13} | {'캐시 ms':>8}")
+    for kb in (4, 64, 256):
+        response = "\n".join(
+            " ".join(rng.choice(words) for _ in range(12)) for _ in range(kb * 1024 // 120)
+        )
+        stages = default_stages(summarize=lambda text: time.sleep(summary_ms / 1000) or "요약 제목")
+
+        serial, results = 0.0, {}
+        for stage in stages:            # 정의 순서 = 의존 순서
+            t0 = time.perf_counter()
+            results[stage.name] = stage.fn(response, results)
+            serial += (time.perf_counter() - t0) * 1000
+
+        pipeline = Pipeline(stages)
+        enabled  = [stage.name for stage in stages]     # redact(기본 꺼짐)까지 전부
+        t0 = time.perf_counter()
+        assert pipeline.run(response, enabled) == results
+        cold = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        pipeline.run(response, enabled)
+        warm = (time.perf_counter() - t0) * 1000
+        pipeline.close()
+        print(f"{kb:5d}K | {serial:12.1f} | {cold:13.1f} | {warm:8.3f}")
+
+
+# ── 발송 기록 색인 ─────────────────────────────────────────────────────────────
+
+def bench_deliveries(lookups: int = 20_000):
+    from delivery_index import DeliveryIndex
+
+    rng = random.Random(2)
+    print(f"{'기록 수':>9} | {'파일 MB':>7} | {'로드 ms':>8} | {'조회 µs':>8} | {'Message-ID 조회 µs':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (1_000, 10_000, 100_000, 500_000):
+            path = os.path.join(tmp, f"deliveries_{n}.jsonl")
+            with open(path, "w") as f:
+                for i in range(n):
+                    f.write(json.dumps({
+                        "job_id": f"{i:032x}", "message_id": f"<{i}.bench@gmail.com>",
+                        "subject": "[Gemini] 장애 대응 절차 요약", "sender": "a@gmail.com",
+                        "receiver": "b@gmail.com", "references": [], "code": 250,
+                        "reply": "2.0.0 OK  1700000000 abc.123 - gsmtp", "sent": 1.7e9 + i,
+                    }, ensure_ascii=False) + "\n")
+
+            t0 = time.perf_counter()
+            index = DeliveryIndex(path)
+            load = (time.perf_counter() - t0) * 1000
+
+            ids = [rng.randrange(n) for _ in range(lookups)]
+            t0 = time.perf_counter()
+            for i in ids:
+                index.get(f"{i:032x}")
+            per_job = (time.perf_counter() - t0) / lookups * 1e6
+            t0 = time.perf_counter()
+            for i in ids:
+                index.by_message_id(f"<{i}.bench@gmail.com>")
+            per_msgid = (time.perf_counter() - t0) / lookups * 1e6
+            print(f"{n:9,d} | {os.path.getsize(path) / 1024 / 1024:7.1f} | {load:8.1f} | "
+                  f"{per_job:8.1f} | {per_msgid:18.1f}")
+
+
+# ── 보관함 ────────────────────────────────────────────────────────────────────
+
+def bench_archive(lookups: int = 2_000):
+    import gzip
+
+    from archive import Archive
+
+    rng   = random.Random(3)
+    words = ["장애", "대응", "절차", "서버", "로그", "확인", "배포", "롤백", "원인", "분석",
+             "the", "request", "timeout", "retry", "cache", "queue"]
+    print(f"{'레코드':>7} | {'원본 MB':>7} | {'압축 MB':>7} | {'추가 µs':>7} | {'로드 ms':>7} | "
+          f"{'조회 µs':>7} | {'10% 내보내기 ms':>15} | {'gzip 훑기 ms':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (1_000, 10_000, 30_000):
+            path = os.path.join(tmp, f"archive_{n}.jsonl.gz")
+            archive, raw, ids = Archive(path), 0, []
+            t0 = time.perf_counter()
+            for i in range(n):
+                response = " ".join(rng.choice(words) for _ in range(rng.randrange(100, 600)))
+                ids.append(f"{i:032x}")
+                archive.append(ids[-1], {"ts": 1.7e9 + i, "prompt": f"질문 {i}", "response": response})
+                raw += len(response.encode("utf-8")) + 80
+            append = (time.perf_counter() - t0) / n * 1e6
+
+            t0 = time.perf_counter()
+            archive = Archive(path)
+            load = (time.perf_counter() - t0) * 1000
+
+            picks = [rng.choice(ids) for _ in range(lookups)]
+            t0 = time.perf_counter()
+            for record_id in picks:
+                archive.get(record_id)
+            get = (time.perf_counter() - t0) / lookups * 1e6
+
+            since, until = 1.7e9 + n * 0.45, 1.7e9 + n * 0.55
+            t0 = time.perf_counter()
+            with open(os.devnull, "wb") as out:
+                archive.export(out, since, until)
+            export = (time.perf_counter() - t0) * 1000
+
+            # 비교: 색인 없이 .jsonl.gz 전체를 풀며 기간 고르기
+            t0 = time.perf_counter()
+            with gzip.open(path, "rt", encoding="utf-8") as f, open(os.devnull, "w") as out:
+                for line in f:
+                    if since <= json.loads(line)["ts"] < until:
+                        out.write(line)
+            scan = (time.perf_counter() - t0) * 1000
+
+            print(f"{n:7,d} | {raw / 1024 / 1024:7.1f} | {os.path.getsize(path) / 1024 / 1024:7.1f} | "
+                  f"{append:7.1f} | {load:7.1f} | {get:7.1f} | {export:15.1f} | {scan:12.1f}")
+
+
+BENCHES = {
+    "stream": bench_stream,
+    "attach": bench_attach,
+    "ttff": bench_ttff,
+    "vault": bench_vault,
+    "post": bench_post,
+    "ui": bench_ui,
+    "deliveries": bench_deliveries,
+    "archive": bench_archive,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHES)
+    for name in names:
+        print(f"\n=== {name} ===")
+        BENCHES[name]()
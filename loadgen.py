@@ -0,0 +1,433 @@
+"""
+Gemini Client — 부하 생성기 (질문 → 응답 → 메일 전체 경로 소크 테스트)
+════════════════════════════════════════════════════════════════════════════════
+android_app/의 실제 call_gemini / send_email 코드를 정해진 시간 동안 반복
+실행하고 처리량, 오류 종류, 지연 시간 분포, 자원 사용량을 보고합니다.
+
+사용법:
+  python loadgen.py --rate 20 --duration 60           # 개방형: 초당 20건 도착
+  python loadgen.py --concurrency 8 --duration 300    # 폐쇄형: 동시 8건 유지
+  python loadgen.py --rate 5 --mock-error-rate 0.05   # 모의 서버 5% 오류 응답
+  python loadgen.py --real --rate 0.2 --duration 60   # 실제 Gemini/Gmail (할당량 주의)
+
+  기본은 로컬 모의 서버 (Gemini HTTP + SMTP)를 띄워 그쪽으로 보냅니다.
+  --real은 android_app/config.json (+ vault.json)의 키/계정을 사용합니다.
+
+  개방형(--rate)은 지연 시간을 '예정된 도착 시각'부터 잽니다 — 서버가 느려져도
+  요청을 늦추지 않으므로 대기열 지연까지 지연 시간에 포함됩니다.
+
+오류 종류는 앱과 같은 판정 함수(is_network_error / throttle_cooldown /
+error_message 기준)로 main.py _process()의 분기(대기열 / 포기 / 기타)에 맞춰 나눕니다.
+════════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import json
+import os
+import random
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "android_app")
+sys.path.insert(0, APP_DIR)
+
+import requests
+
+import gemini_api
+import mailer
+import sender_pool
+
+# ── 오류 분류 (main.py _process와 같은 기준) ──────────────────────────────────
+# 앱이 쓰는 판정 함수를 그대로 써서 분류마다 _process의 분기 하나에 대응
+
+ERROR_CLASSES = {
+    "queued_network":  "→ 대기열: 오프라인/타임아웃/429·5xx (is_network_error)",
+    "queued_throttle": "→ 대기열: SMTP 스로틀 — 발신 계정 휴식 (throttle_cooldown)",
+    "fatal":           "다시 시도 안 함: API 400/403 등, 이메일 인증 실패 (error_message)",
+    "other":           "기타 오류",
+}
+
+
+def classify(exc: Exception) -> str:
+    """'분류 세부' — 세부는 앱이 상태 표시줄에 쓰는 구분."""
+    if gemini_api.is_network_error(exc):
+        return f"queued_network {gemini_api.failure_reason(exc)}"
+    if sender_pool.throttle_cooldown(exc) is not None:
+        return f"queued_throttle {getattr(exc, 'smtp_code', type(exc).__name__)}"
+    if isinstance(exc, requests.exceptions.HTTPError):
+        status = exc.response.status_code if exc.response is not None else "?"
+        return f"fatal api_{status}"
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return "fatal smtp_auth"
+    return f"other {type(exc).__name__}"
+
+
+# ── 모의 서버 ─────────────────────────────────────────────────────────────────
+
+def _jitter(mean: float) -> float:
+    return mean * random.uniform(0.5, 1.5) if mean > 0 else 0.0
+
+
+class MockGemini(ThreadingHTTPServer):
+    """generateContent 응답을 흉내 내는 HTTP 서버 (지연/오류 비율 조절)."""
+
+    daemon_threads     = True
+    request_queue_size = 256       # 기본 5로는 동시 접속이 몰릴 때 연결이 버려짐
+
+    def __init__(self, latency: float, error_rate: float, response_bytes: int):
+        text = ("부하 테스트 응답입니다. " * (response_bytes // 30 + 1))[:response_bytes // 3]
+        self.body = json.dumps({
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+            }],
+        }).encode()
+        self.latency    = latency
+        self.error_rate = error_rate
+        super().__init__(("127.0.0.1", 0), _GeminiHandler)
+
+
+class _GeminiHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"      # keep-alive — 실제 API처럼 연결 재사용
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(_jitter(self.server.latency))
+        if random.random() < self.server.error_rate:
+            status, body = random.choice((429, 500, 503)), b'{"error": {"message": "mock"}}'
+        else:
+            status, body = 200, self.server.body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockSMTP(socketserver.ThreadingTCPServer):
+    """EHLO/AUTH PLAIN/MAIL/RCPT/DATA/QUIT만 처리하는 SMTP 서버 (STARTTLS 없음)."""
+
+    daemon_threads      = True
+    allow_reuse_address = True
+    request_queue_size  = 256
+
+    def __init__(self, latency: float, error_rate: float):
+        self.latency    = latency
+        self.error_rate = error_rate
+        self.queued     = 0
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def _reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        self._reply("220 mock ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.split(b" ", 1)[0].strip().upper()
+            if verb in (b"EHLO", b"HELO"):
+                self.wfile.write(b"250-mock\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == b"AUTH":
+                self._reply("235 2.7.0 Accepted")
+            elif verb in (b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                self._reply("250 2.1.0 OK")
+            elif verb == b"DATA":
+                self._reply("354 Go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                time.sleep(_jitter(server.latency))
+                if random.random() < server.error_rate:
+                    self._reply("421 4.7.0 Try again later, closing connection")
+                    return
+                server.queued += 1
+                self._reply(f"250 2.0.0 OK {server.queued} - mock")
+            elif verb == b"QUIT":
+                self._reply("221 2.0.0 closing connection")
+                return
+            else:
+                self._reply("502 5.5.1 Unrecognized command")
+
+
+def start_mock_servers(args) -> list:
+    gemini = MockGemini(args.mock_latency, args.mock_error_rate, args.mock_response_bytes)
+    smtp   = MockSMTP(args.mock_smtp_latency, args.mock_error_rate)
+    for server in (gemini, smtp):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    gemini_api.GEMINI_API_URL = f"http://127.0.0.1:{gemini.server_address[1]}/v1beta/mock:generateContent"
+    session = gemini_api.http_session()
+    session.mount("http://", session.get_adapter("https://"))   # 앱과 같은 연결 풀 크기
+    mailer.GMAIL_SMTP_HOST = "127.0.0.1"
+    mailer.GMAIL_SMTP_PORT = smtp.server_address[1]
+    mailer.GMAIL_SMTP_TLS  = False
+    return [gemini, smtp]
+
+
+def load_real_config() -> dict:
+    """android_app/config.json + (있으면) vault.json의 비밀 값."""
+    with open(os.path.join(APP_DIR, "config.json")) as f:
+        cfg = json.load(f)
+    from vault import CredentialVault, default_key_source, merge_secrets
+
+    source = default_key_source()
+    vault_path = os.path.join(APP_DIR, "vault.json")
+    if source is not None and os.path.exists(vault_path):
+        cfg = merge_secrets(cfg, CredentialVault(vault_path, source).secrets())
+    return cfg
+
+
+# ── 측정 ──────────────────────────────────────────────────────────────────────
+
+HISTOGRAM_BOUNDS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class Stats:
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self.started  = 0
+        self.ok       = 0
+        self.errors   = {}
+        self.inflight = 0
+        self.latency  = {"gemini": [], "mail": [], "total": []}
+
+    def begin(self):
+        with self._lock:
+            self.started  += 1
+            self.inflight += 1
+
+    def end(self, timings: dict, error: str = None):
+        with self._lock:
+            self.inflight -= 1
+            for name, ms in timings.items():
+                self.latency[name].append(ms)
+            if error is None:
+                self.ok += 1
+            else:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def snapshot(self) -> tuple:
+        with self._lock:
+            return self.started, self.ok, sum(self.errors.values()), self.inflight
+
+
+def run_job(n: int, cfg: dict, stats: Stats, scheduled: float, prompt: str, timeout: float):
+    """질문 하나: call_gemini → send_email. scheduled는 예정 도착 시각 (perf_counter)."""
+    stats.begin()
+    timings = {}
+    error   = None
+    try:
+        t0 = time.perf_counter()
+        response = gemini_api.call_gemini(cfg["gemini_api_key"], prompt.format(n=n), timeout=timeout)
+        t1 = time.perf_counter()
+        timings["gemini"] = (t1 - t0) * 1000
+        mailer.send_email(
+            cfg["gmail_sender"], cfg["gmail_password"], cfg["gmail_receiver"],
+            prompt.format(n=n), response,
+        )
+        timings["mail"] = (time.perf_counter() - t1) * 1000
+    except Exception as exc:
+        error = classify(exc)
+    timings["total"] = (time.perf_counter() - scheduled) * 1000
+    stats.end(timings, error)
+
+
+class ResourceSampler(threading.Thread):
+    """interval마다 처리량/진행 중 요청/CPU/RSS/스레드/열린 파일 수를 기록하고 출력."""
+
+    def __init__(self, stats: Stats, interval: float):
+        super().__init__(daemon=True)
+        self.stats    = stats
+        self.interval = interval
+        self.rows     = []
+        self._done    = threading.Event()
+
+    @staticmethod
+    def _rss_mb() -> float:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+        except (OSError, ValueError, AttributeError):
+            import resource    # /proc 없는 macOS: 최대 RSS (바이트 단위)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 / 1024
+
+    @staticmethod
+    def _open_fds() -> int:
+        try:
+            return len(os.listdir("/proc/self/fd"))
+        except OSError:
+            return -1
+
+    def run(self):
+        print(f"{'경과 s':>7} | {'완료/s':>7} | {'오류/s':>6} | {'진행 중':>6} | {'CPU %':>6} | "
+              f"{'RSS MB':>7} | {'스레드':>5} | {'fd':>4}")
+        t_prev, cpu_prev = time.perf_counter(), time.process_time()
+        done_prev = err_prev = 0
+        start = t_prev
+        while not self._done.wait(self.interval):
+            now, cpu = time.perf_counter(), time.process_time()
+            _, ok, errors, inflight = self.stats.snapshot()
+            dt  = now - t_prev
+            row = (
+                now - start,
+                (ok - done_prev) / dt,
+                (errors - err_prev) / dt,
+                inflight,
+                100 * (cpu - cpu_prev) / dt,
+                self._rss_mb(),
+                threading.active_count(),
+                self._open_fds(),
+            )
+            self.rows.append(row)
+            print(f"{row[0]:7.1f} | {row[1]:7.1f} | {row[2]:6.1f} | {row[3]:6d} | {row[4]:6.1f} | "
+                  f"{row[5]:7.1f} | {row[6]:5d} | {row[7]:4d}", flush=True)
+            t_prev, cpu_prev, done_prev, err_prev = now, cpu, ok, errors
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# ── 부하 모델 ─────────────────────────────────────────────────────────────────
+
+def open_loop(args, cfg: dict, stats: Stats):
+    """초당 rate건 도착 (포아송 또는 균등 간격). 서버가 느려져도 도착을 늦추지 않음."""
+    with ThreadPoolExecutor(max_workers=args.max_inflight) as pool:
+        start = time.perf_counter()
+        at, n = start, 0
+        while at - start < args.duration:
+            delay = at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run_job, n, cfg, stats, at, args.prompt, args.timeout)
+            n  += 1
+            at += random.expovariate(args.rate) if args.arrival == "poisson" else 1 / args.rate
+
+
+def closed_loop(args, cfg: dict, stats: Stats):
+    """동시 concurrency건을 유지 — 하나가 끝나면 바로 다음 질문."""
+    deadline = time.perf_counter() + args.duration
+    counter  = iter(range(10 ** 12))
+    lock     = threading.Lock()
+
+    def _worker():
+        while time.perf_counter() < deadline:
+            with lock:
+                n = next(counter)
+            run_job(n, cfg, stats, time.perf_counter(), args.prompt, args.timeout)
+
+    workers = [threading.Thread(target=_worker) for _ in range(args.concurrency)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+
+# ── 보고 ──────────────────────────────────────────────────────────────────────
+
+def _percentile(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def print_report(stats: Stats, elapsed: float, sampler: ResourceSampler):
+    total = stats.ok + sum(stats.errors.values())
+    print(f"\n=== 요약 ({elapsed:.1f}초) ===")
+    print(f"시작 {stats.started}건 / 완료 {total}건 — 성공 {stats.ok}건, "
+          f"처리량 {stats.ok / elapsed:.2f}건/s")
+
+    if stats.errors:
+        print("\n오류 종류:")
+        for key, count in sorted(stats.errors.items(), key=lambda kv: -kv[1]):
+            desc = ERROR_CLASSES.get(key.split(" ")[0], "")
+            print(f"  {count:6d}  {key:<34} {desc}")
+
+    for name, values in stats.latency.items():
+        if not values:
+            continue
+        values = sorted(values)
+        print(f"\n지연 시간 — {name} ({len(values)}건): "
+              f"p50 {_percentile(values, 0.50):.0f} / p90 {_percentile(values, 0.90):.0f} / "
+              f"p99 {_percentile(values, 0.99):.0f} / 최대 {values[-1]:.0f} ms")
+        counts, lower, i = [], 0, 0
+        for bound in HISTOGRAM_BOUNDS_MS + (float("inf"),):
+            c = 0
+            while i < len(values) and values[i] < bound:
+                c += 1
+                i += 1
+            counts.append((lower, bound, c))
+            lower = bound
+        peak = max(c for _, _, c in counts)
+        for lo, hi, c in counts:
+            if c:
+                label = f"{lo:>6g}–{hi:<6g}" if hi != float("inf") else f"{lo:>6g}+      "
+                print(f"  {label} ms | {'█' * max(1, round(40 * c / peak)):<40} {c}")
+
+    if sampler.rows:
+        rss  = [r[5] for r in sampler.rows]
+        cpu  = [r[4] for r in sampler.rows]
+        fds  = [r[7] for r in sampler.rows]
+        print(f"\n자원: RSS {rss[0]:.1f} → {rss[-1]:.1f} MB (최대 {max(rss):.1f}), "
+              f"CPU 평균 {sum(cpu) / len(cpu):.1f}%, 열린 fd 최대 {max(fds)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="질문 → 응답 → 메일 경로 부하 생성기")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rate", type=float, help="개방형: 초당 도착 수")
+    mode.add_argument("--concurrency", type=int, help="폐쇄형: 동시 실행 수")
+    parser.add_argument("--duration", type=float, default=30, help="실행 시간 (초)")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--max-inflight", type=int, default=256, help="개방형 최대 동시 실행 수")
+    parser.add_argument("--interval", type=float, default=5, help="자원 사용량 출력 간격 (초)")
+    parser.add_argument("--timeout", type=float, default=120, help="call_gemini 타임아웃 (초)")
+    parser.add_argument("--prompt", default="부하 테스트 질문 #{n}")
+    parser.add_argument("--real", action="store_true", help="모의 서버 대신 실제 Gemini/Gmail")
+    parser.add_argument("--mock-latency", type=float, default=0.8, help="모의 Gemini 평균 지연 (초)")
+    parser.add_argument("--mock-smtp-latency", type=float, default=0.2, help="모의 SMTP 평균 지연 (초)")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-response-bytes", type=int, default=4096)
+    args = parser.parse_args()
+
+    if args.real:
+        cfg = load_real_config()
+        print("실제 엔드포인트 사용 — Gemini 할당량과 Gmail 발송 한도가 소모됩니다")
+    else:
+        start_mock_servers(args)
+        cfg = {
+            "gemini_api_key": "mock", "gmail_sender": "load@mock.local",
+            "gmail_password": "mock", "gmail_receiver": "sink@mock.local",
+        }
+
+    stats   = Stats()
+    sampler = ResourceSampler(stats, args.interval)
+    sampler.start()
+    t0 = time.perf_counter()
+    try:
+        if args.rate:
+            open_loop(args, cfg, stats)
+        else:
+            closed_loop(args, cfg, stats)
+    except KeyboardInterrupt:
+        print("\n중단 — 지금까지 결과를 보고합니다")
+    elapsed = time.perf_counter() - t0
+    sampler.stop()
+    print_report(stats, elapsed, sampler)
+
+
+if __name__ == "__main__":
+    main()
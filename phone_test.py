@@ -1,13 +1,27 @@
 """
 Gemini Client — Termux(Android) CLI 테스트용
 Kivy 불필요, requests + smtplib만 사용
+
+  python phone_test.py            # 대화형 (질문 입력 → 응답 → 메일)
+  python phone_test.py --daemon   # config.json의 "schedules"를 주기적으로 실행
+
+예약 질문 (config.json):
+  "schedules": [
+    {"id": "morning", "cron": "0 8 * * 1-5", "prompt": "오늘의 IT 뉴스 요약"}
+  ]
+  cron: 분 시 일 월 요일(0=일)  — *, */n, a-b, a-b/n, a,b 지원
 """
-import json, os, smtplib, ssl
+import json, os, smtplib, ssl, sys, time
+from datetime import datetime, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import requests
 
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+SCHEDULE_STATE_FILE = os.path.join(os.path.dirname(CONFIG_FILE), "schedule_state.json")
+SCHEDULE_SPREAD = 30   # 같은 시각에 걸린 예약끼리 띄우는 간격 (초)
+GEMINI_TIMEOUT = (10, 120)   # (연결, 읽기) 초 — 멈춘 연결이 예약 루프를 막지 않도록
+SMTP_TIMEOUT = 30            # SMTP 연결/응답 대기 (초)
 GEMINI_API_URL = (
     "https://generativelanguage.googleapis.com/v1beta/models/"
     "gemini-flash-latest:generateContent"
@@ -38,7 +52,7 @@ def call_gemini(api_key, prompt):
         GEMINI_API_URL,
         params={"key": api_key},
         json={"contents": [{"parts": [{"text": prompt}]}]},
-        timeout=120,
+        timeout=GEMINI_TIMEOUT,
     )
     resp.raise_for_status()
     parts = resp.json()["candidates"][0]["content"]["parts"]
@@ -52,17 +66,145 @@ def send_email(cfg, prompt, response):
     msg["To"]      = cfg["gmail_receiver"]
     msg.attach(MIMEText(f"[질문]\n{prompt}\n\n[응답]\n{response}", "plain", "utf-8"))
     ctx = ssl.create_default_context()
-    with smtplib.SMTP("smtp.gmail.com", 587) as s:
+    with smtplib.SMTP("smtp.gmail.com", 587, timeout=SMTP_TIMEOUT) as s:
         s.ehlo(); s.starttls(context=ctx)
         s.login(cfg["gmail_sender"], cfg["gmail_password"])
         s.sendmail(cfg["gmail_sender"], cfg["gmail_receiver"], msg.as_string())
 
+# ── 예약 질문 (cron) ─────────────────────────────────────────────────────────
+
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12)]   # 분 시 일 월
+
+def parse_cron_field(field, lo, hi):
+    values = set()
+    for part in field.split(","):
+        rng, step = (part.split("/") + ["1"])[:2]
+        if rng == "*":
+            a, b = lo, hi
+        elif "-" in rng:
+            a, b = map(int, rng.split("-"))
+        else:
+            a = int(rng)
+            b = hi if "/" in part else a
+        values.update(range(a, b + 1, int(step)))
+    values &= set(range(lo, hi + 1))
+    if not values:
+        raise ValueError(f"cron 필드 오류: {field}")
+    return values
+
+def parse_cron(expr):
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"cron 식은 5개 필드여야 합니다: {expr}")
+    minutes, hours, days, months = (parse_cron_field(f, lo, hi)
+                                    for f, (lo, hi) in zip(fields, CRON_RANGES))
+    dows = {d % 7 for d in parse_cron_field(fields[4], 0, 7)}   # 7 = 일요일
+    return minutes, hours, days, months, dows, fields[2] == "*", fields[4] == "*"
+
+def cron_day_ok(cron, t):
+    _, _, days, months, dows, any_day, any_dow = cron
+    dom_ok, dow_ok = t.day in days, (t.weekday() + 1) % 7 in dows
+    # 일/요일이 둘 다 지정되면 cron처럼 OR
+    return dom_ok and dow_ok if any_day or any_dow else dom_ok or dow_ok
+
+def cron_matches(cron, t):
+    return (t.minute in cron[0] and t.hour in cron[1] and t.month in cron[3]
+            and cron_day_ok(cron, t))
+
+def cron_next(cron, after):
+    """after 이후 (분 단위) 첫 실행 시각."""
+    minutes, hours, _, months = cron[:4]
+    t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = t + timedelta(days=366 * 5)
+    while t < limit:
+        if t.month not in months:
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+        elif not cron_day_ok(cron, t):
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+        elif t.hour not in hours:
+            t = t.replace(minute=0) + timedelta(hours=1)
+        elif t.minute not in minutes:
+            t += timedelta(minutes=1)
+        else:
+            return t
+    raise ValueError("cron 식에 해당하는 시각이 없습니다")
+
+def next_slot(crons, job_id, after):
+    """다음 실행 시각(epoch). 같은 분에 걸린 예약끼리는 id 순으로 SCHEDULE_SPREAD초씩 띄움."""
+    base = cron_next(crons[job_id], after)
+    rank = sorted(k for k, c in crons.items() if cron_matches(c, base)).index(job_id)
+    return base.timestamp() + rank * SCHEDULE_SPREAD
+
+def load_schedule_state():
+    try:
+        with open(SCHEDULE_STATE_FILE) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_schedule_state(state):
+    tmp = SCHEDULE_STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, SCHEDULE_STATE_FILE)
+
+def run_job(cfg, job):
+    stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        response = call_gemini(cfg["gemini_api_key"], job["prompt"])
+        send_email(cfg, job["prompt"], response)
+        print(f"[{stamp}] {job['id']} 완료 — {cfg['gmail_receiver']}로 발송됨")
+    except Exception as e:
+        print(f"[{stamp}] {job['id']} 오류: {e}")
+
+def daemon(cfg):
+    jobs = {j["id"]: j for j in cfg.get("schedules", [])}
+    if not jobs:
+        print("config.json에 \"schedules\"가 없습니다")
+        return
+    crons = {k: parse_cron(j["cron"]) for k, j in jobs.items()}
+    saved = load_schedule_state()
+    now = datetime.now()
+    state = {}
+    missed = 0
+    for job_id in sorted(jobs):
+        # 꺼져 있는 동안 놓친 실행은 몇 번이든 한 번으로 합쳐서,
+        # 놓친 예약끼리도 SCHEDULE_SPREAD초씩 띄워 아래 루프에서 실행
+        if saved.get(job_id, float("inf")) <= now.timestamp():
+            state[job_id] = now.timestamp() + missed * SCHEDULE_SPREAD
+            missed += 1
+        else:
+            state[job_id] = next_slot(crons, job_id, now)
+    save_schedule_state(state)
+    print(f"예약 {len(jobs)}건 대기 중 — 종료: Ctrl+C")
+    for job_id, ts in sorted(state.items(), key=lambda kv: kv[1]):
+        print(f"  {job_id}: {datetime.fromtimestamp(ts):%Y-%m-%d %H:%M:%S}")
+
+    while True:
+        try:
+            job_id, ts = min(state.items(), key=lambda kv: kv[1])
+            time.sleep(max(0, min(ts - time.time(), 60)))
+            if time.time() < ts:
+                continue
+            run_job(cfg, jobs[job_id])
+            # 실행이 길어지거나 폰이 잠들어 지나간 슬롯은 건너뜀 (한 번만 실행)
+            after = max(datetime.now(), datetime.fromtimestamp(ts))
+            state[job_id] = next_slot(crons, job_id, after)
+            save_schedule_state(state)
+        except KeyboardInterrupt:
+            print("\n종료")
+            break
+
 def main():
     cfg = load_config()
     if not all(cfg.get(k) for k in ["gemini_api_key","gmail_sender","gmail_password","gmail_receiver"]):
         cfg = setup()
         save_config(cfg)
 
+    if "--daemon" in sys.argv[1:]:
+        daemon(cfg)
+        return
+
     print(f"\n준비 완료 — 수신자: {cfg['gmail_receiver']}")
     print("종료: Ctrl+C\n")
 
@@ -9,14 +9,17 @@ android_app/main.py 와 동일한 기능을 tkinter로 구현한 Mac 전용 테
 import json
 import os
 import smtplib
+import socket
 import ssl
 import threading
+import time
 import tkinter as tk
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from tkinter import messagebox
 
 import requests
+import urllib3
 
 # ── 설정 파일 경로 ─────────────────────────────────────────────────────────────
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
@@ -29,6 +32,13 @@ GEMINI_API_URL = (
 GMAIL_SMTP_HOST = "smtp.gmail.com"
 GMAIL_SMTP_PORT = 587
 
+# 연결 / 읽기 타임아웃 (초)과 전송 한 건 전체 제한 시간
+CONNECT_TIMEOUT      = 10
+READ_TIMEOUT         = 120
+SMTP_CONNECT_TIMEOUT = 10
+SMTP_READ_TIMEOUT    = 30
+JOB_DEADLINE         = 180
+
 
 # ── 설정 저장/불러오기 ─────────────────────────────────────────────────────────
 
@@ -45,19 +55,120 @@ def save_config(data: dict) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+# ── 취소 / 전체 제한 시간 (android_app/cancel.py 축약판) ─────────────────────
+
+class JobCancelled(Exception):
+    pass
+
+
+class DeadlineExceeded(JobCancelled):
+    pass
+
+
+class Job:
+    """전송 한 건. cancel()하면 진행 중인 HTTP/SMTP 소켓을 끊어 작업자 스레드를 깨웁니다."""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self._started = time.monotonic()
+        self._error   = None
+        self._socks   = []
+        self._lock    = threading.Lock()
+        self._timer   = threading.Timer(deadline, self.cancel, args=(
+            DeadlineExceeded(f"전체 제한 시간 {deadline:g}초 초과"),
+        ))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self, error: JobCancelled = None):
+        with self._lock:
+            if self._error is not None:
+                return
+            self._error = error or JobCancelled("취소됨")
+            socks = list(self._socks)
+        for sock in socks:
+            _shutdown(sock)
+
+    def watch(self, sock):
+        """sock을 취소 대상에 추가 (이미 취소됐으면 바로 끊음)."""
+        with self._lock:
+            self._socks.append(sock)
+            if self._error is None:
+                return
+        _shutdown(sock)
+
+    def check(self, cause: BaseException = None):
+        if self._error is not None:
+            raise self._error from cause
+
+    def timeout(self, connect: float, read: float) -> tuple:
+        self.check()
+        left = max(0.0, self.deadline - (time.monotonic() - self._started))
+        return min(connect, left), min(read, left)
+
+    def close(self):
+        self._timer.cancel()
+
+
+def _shutdown(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+# 요청을 보내는 스레드의 Job — 연결이 요청 직전에 자기 소켓을 등록
+_local = threading.local()
+
+
+class _WatchedHTTPSConnection(urllib3.connection.HTTPSConnection):
+    def request(self, *args, **kwargs):
+        job = getattr(_local, "job", None)
+        if job is not None and self.sock is not None:
+            job.watch(self.sock)
+        return super().request(*args, **kwargs)
+
+
+class _WatchedHTTPSPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _WatchedHTTPSConnection
+
+
+class _WatchedAdapter(requests.adapters.HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            **self.poolmanager.pool_classes_by_scheme, "https": _WatchedHTTPSPool,
+        }
+
+
+_session = requests.Session()
+_session.mount("https://", _WatchedAdapter())
+
+
 # ── Gemini API 호출 ────────────────────────────────────────────────────────────
 
-def call_gemini(api_key: str, prompt: str, timeout: int = 120) -> str:
+def call_gemini(api_key: str, prompt: str, job: Job = None) -> str:
     payload = {
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {"temperature": 0.7, "maxOutputTokens": 8192},
     }
-    resp = requests.post(
-        GEMINI_API_URL,
-        params={"key": api_key},
-        json=payload,
-        timeout=timeout,
-    )
+    timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if job is not None:
+        timeout = job.timeout(*timeout)
+    _local.job = job
+    try:
+        resp = _session.post(
+            GEMINI_API_URL,
+            params={"key": api_key},
+            json=payload,
+            timeout=timeout,
+        )
+    except Exception as exc:
+        if job is not None:
+            job.check(exc)
+        raise
+    finally:
+        _local.job = None
     resp.raise_for_status()
     data = resp.json()
     candidates = data.get("candidates", [])
@@ -70,7 +181,8 @@ def call_gemini(api_key: str, prompt: str, timeout: int = 120) -> str:
 
 # ── 이메일 발송 ────────────────────────────────────────────────────────────────
 
-def send_email(sender: str, password: str, receiver: str, prompt: str, response: str) -> None:
+def send_email(sender: str, password: str, receiver: str, prompt: str, response: str,
+               job: Job = None) -> None:
     subject = f"[Gemini] {prompt[:40]}{'...' if len(prompt) > 40 else ''}"
     plain = f"[질문]\n{prompt}\n\n[Gemini 응답]\n{response}"
     html = f"""<html><body>
@@ -87,12 +199,23 @@ def send_email(sender: str, password: str, receiver: str, prompt: str, response:
     msg.attach(MIMEText(plain, "plain", "utf-8"))
     msg.attach(MIMEText(html,  "html",  "utf-8"))
 
+    connect, read = SMTP_CONNECT_TIMEOUT, SMTP_READ_TIMEOUT
+    if job is not None:
+        connect, read = job.timeout(connect, read)
     context = ssl.create_default_context()
-    with smtplib.SMTP(GMAIL_SMTP_HOST, GMAIL_SMTP_PORT) as server:
-        server.ehlo()
-        server.starttls(context=context)
-        server.login(sender, password)
-        server.sendmail(sender, receiver, msg.as_string())
+    try:
+        with smtplib.SMTP(GMAIL_SMTP_HOST, GMAIL_SMTP_PORT, timeout=connect) as server:
+            server.sock.settimeout(read)
+            if job is not None:
+                job.watch(server.sock)      # starttls() 후에도 같은 TCP 소켓
+            server.ehlo()
+            server.starttls(context=context)
+            server.login(sender, password)
+            server.sendmail(sender, receiver, msg.as_string())
+    except Exception as exc:
+        if job is not None:
+            job.check(exc)
+        raise
 
 
 # ── 색상 버튼 (Mac에서 tk.Button bg 색상 무시 문제 우회) ──────────────────────
@@ -259,6 +382,7 @@ class GeminiApp:
     def __init__(self, root: tk.Tk):
         self.root   = root
         self.config = load_config()
+        self.job    = None
         root.title("Gemini 클라이언트 (Mac 테스트)")
         root.configure(bg="#1a1a2e")
         root.geometry("640x700")
@@ -303,18 +427,31 @@ class GeminiApp:
                                  wrap="word")
         self.input_box.pack(fill="x", padx=16, pady=(4, 8))
 
-        # 전송 버튼
+        # 전송 / 취소 버튼
+        send_row = tk.Frame(self.root, bg=BG)
+        send_row.pack(fill="x", padx=16, pady=(0, 10))
         self.send_btn = ColorButton(
-            self.root,
+            send_row,
             text="Gemini에 전송하고 메일 발송",
             command=self._on_send,
             bg="#1a73e8",
             font=("Arial", 14, "bold"),
             padx=0, pady=12,
         )
-        self.send_btn.pack(fill="x", padx=16, pady=(0, 10))
+        self.send_btn.pack(side="left", fill="x", expand=True)
         self.send_btn.config_state(disabled=True)
 
+        self.cancel_btn = ColorButton(
+            send_row,
+            text="취소",
+            command=self._on_cancel,
+            bg="#993333",
+            font=("Arial", 14, "bold"),
+            padx=18, pady=12,
+        )
+        self.cancel_btn.pack(side="left", padx=(8, 0))
+        self.cancel_btn.config_state(disabled=True)
+
         # 응답 영역
         resp_hdr = tk.Frame(self.root, bg=BG)
         resp_hdr.pack(fill="x", padx=16)
@@ -361,23 +498,38 @@ class GeminiApp:
             self._set_status("질문을 입력해주세요", error=True)
             return
         self.send_btn.config_state(disabled=True)
+        self.cancel_btn.config_state(disabled=False)
         self.input_box.delete("1.0", "end")
         self._set_response("")
         self._set_status("Gemini 응답 수신 중...")
-        threading.Thread(target=self._process, args=(prompt,), daemon=True).start()
+        self.job = Job(float(self.config.get("job_deadline", JOB_DEADLINE)))
+        threading.Thread(target=self._process, args=(prompt, self.job), daemon=True).start()
+
+    def _on_cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self._set_status("취소 중...")
 
-    def _process(self, prompt: str):
+    def _process(self, prompt: str, job: Job):
         cfg = self.config
         try:
-            response = call_gemini(cfg["gemini_api_key"], prompt)
+            response = call_gemini(cfg["gemini_api_key"], prompt, job)
             self.root.after(0, lambda: self._set_response(response))
             self.root.after(0, lambda: self._set_status("이메일 발송 중..."))
 
             send_email(cfg["gmail_sender"], cfg["gmail_password"],
-                       cfg["gmail_receiver"], prompt, response)
+                       cfg["gmail_receiver"], prompt, response, job)
             self.root.after(0, lambda: self._set_status(
                 f"완료 — 메일 발송: {cfg['gmail_receiver']}", ok=True))
 
+        except DeadlineExceeded as exc:
+            # exc는 except 블록을 벗어나면 지워지므로 문구를 미리 만듦
+            msg = f"타임아웃 — {exc}"
+            self.root.after(0, lambda: self._set_status(msg, error=True))
+
+        except JobCancelled:
+            self.root.after(0, lambda: self._set_status("취소됨"))
+
         except requests.exceptions.HTTPError as e:
             status = e.response.status_code if e.response else "?"
             if status == 400:
@@ -401,10 +553,13 @@ class GeminiApp:
                 "이메일 인증 실패 — Gmail 앱 비밀번호를 확인하세요", error=True))
 
         except Exception as exc:
-            self.root.after(0, lambda: self._set_status(f"오류: {exc}", error=True))
+            msg = f"오류: {exc}"
+            self.root.after(0, lambda: self._set_status(msg, error=True))
 
         finally:
+            job.close()
             self.root.after(0, lambda: self.send_btn.config_state(disabled=False))
+            self.root.after(0, lambda: self.cancel_btn.config_state(disabled=True))
 
     # ── UI 헬퍼 ──────────────────────────────────────────────────────────────
 